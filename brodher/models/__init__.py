@@ -2,3 +2,4 @@
 
 from . import models
 from . import scan_barcode
+from . import stock_picking_qrcode_report
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import base64
+import logging
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+# Pixel size of the QR images embedded in the labels
+QR_SIZE = 200
+
+
+class StockPickingQRCodeReport(models.AbstractModel):
+    """Lot/SN QRCode Labels.
+
+    The QR images are rendered once per distinct value before the template
+    runs and embedded as data URIs, instead of letting wkhtmltopdf fetch
+    ``/report/barcode`` once per label through the HTTP workers.
+    """
+    _name = 'report.brodher.stock_picking_qrcode_report'
+    _description = 'Lot/SN QRCode Labels'
+
+    @api.model
+    def _get_qr_values(self, pickings):
+        values = pickings.move_line_ids.lot_id.mapped('name')
+        # SN moves dari brodher_product_serial / brodher_product_Sn, kalau terinstall
+        if 'sn_move_ids' in pickings._fields:
+            values += pickings.sn_move_ids.serial_number_id.mapped('name')
+        return values
+
+    @api.model
+    def _render_qr_codes(self, values):
+        """Return ``{value: PNG data URI}``, each distinct value rendered once"""
+        Report = self.env['ir.actions.report']
+        qr_codes = {}
+        for value in dict.fromkeys(value for value in values if value):
+            try:
+                png = Report.barcode('QR', value, width=QR_SIZE, height=QR_SIZE)
+            except Exception as e:
+                _logger.error('QR Code error for %s: %s' % (value, str(e)))
+                continue
+            qr_codes[value] = 'data:image/png;base64,%s' % base64.b64encode(png).decode()
+        return qr_codes
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['stock.picking'].browse(docids)
+        return {
+            'doc_ids': docids,
+            'doc_model': 'stock.picking',
+            'docs': docs,
+            'qr_codes': self._render_qr_codes(self._get_qr_values(docs)),
+        }
+
+
+class StockPickingQRCodeBarcodeReport(models.AbstractModel):
+    _name = 'report.brodher.stock_picking_qrcode_barcode_report'
+    _inherit = 'report.brodher.stock_picking_qrcode_report'
+    _description = 'QRCode Labels'
+
+    @api.model
+    def _get_qr_values(self, pickings):
+        return [product.barcode or product.default_code for product in pickings.move_line_ids.product_id]
@@ -1,14 +1,15 @@
 {
     'name': 'Product Serial Number Generator',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.1.0',
     'category': 'Inventory',
     'summary': 'Generate Serial Number with QR Code and Scanning',
-    'depends': ['product', 'stock', 'purchase', 'sale'],
+    'depends': ['product', 'stock', 'purchase', 'sale', 'brodher_qr_base'],
     'external_dependencies': {
         'python': ['qrcode'],
     },
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'wizard/product_sn_wizard_views.xml',
         'wizard/message_wizard_views.xml',
         'wizard/scan_sn_wizard_views.xml',
@@ -16,6 +17,7 @@
         'views/product_template_views.xml',
         'views/serial_number_views.xml',
         'views/sn_move_views.xml',
+        'views/sn_generate_job_views.xml',
         'views/stock_picking_views.xml',
         # 'reports/sn_qr_label_report.xml',
     ],
@@ -2,3 +2,4 @@
 
 from . import controllers
 from . import main
+from . import serial_qr
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+from odoo import http
+
+from odoo.addons.brodher_qr_base.controllers.main import qr_png_response
+
+
+class ProductSerialNumberQRController(http.Controller):
+
+    @http.route('/product_sn/qr/<string:name>', type='http', auth='user', methods=['GET'])
+    def serial_number_qr(self, name, **kwargs):
+        """Render the QR image of a serial number on demand"""
+        return qr_png_response(name)
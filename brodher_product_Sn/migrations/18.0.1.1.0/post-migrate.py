@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """product.serial.number.qr_code is no longer stored: drop the rendered PNG attachments"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    attachments = env['ir.attachment'].search([
+        ('res_model', '=', 'product.serial.number'),
+        ('res_field', '=', 'qr_code'),
+    ])
+    attachments.unlink()
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 from . import product_template
 from . import product_product
+from . import sn_sequence
 from . import serial_number
 from . import sn_move
 from . import stock_picking
 from . import stock_move_line
 from . import purchase_order
-from . import sale_order
\ No newline at end of file
+from . import sale_order
+from . import sn_generate_job
@@ -19,11 +19,22 @@ class ProductTemplate(models.Model):
         string='Total Serial Numbers',
         compute='_compute_serial_count'
     )
+    serial_available_count = fields.Integer(string='Available SN', compute='_compute_serial_count')
+    serial_used_count = fields.Integer(string='Used SN', compute='_compute_serial_count')
+    serial_reserved_count = fields.Integer(string='Reserved SN', compute='_compute_serial_count')
     
     @api.depends('serial_number_ids')
     def _compute_serial_count(self):
+        record_ids = [record_id for record_id in self._origin.ids if record_id]
+        counts = self.env['product.serial.number']._read_status_counts(
+            [('product_tmpl_id', 'in', record_ids)], groupby='product_tmpl_id'
+        ) if record_ids else {}
         for record in self:
-            record.serial_count = len(record.serial_number_ids)
+            by_status = counts.get(record._origin, {})
+            record.serial_count = sum(by_status.values())
+            record.serial_available_count = by_status.get('available', 0)
+            record.serial_used_count = by_status.get('used', 0)
+            record.serial_reserved_count = by_status.get('reserved', 0)
     
     def action_generate_serial_numbers(self):
         """Open wizard untuk generate serial numbers"""
@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools import escape_psql
 from datetime import datetime
-import qrcode
+from urllib.parse import quote
 import base64
-from io import BytesIO
 import logging
 
+from odoo.addons.brodher_qr_base.tools.qr_code import render_qr_png_batch
+
 _logger = logging.getLogger(__name__)
 
+# Records per multi-create in generate_serial_number
+GENERATE_CHUNK_SIZE = 1000
+
 class ProductSerialNumber(models.Model):
     _name = 'product.serial.number'
     _description = 'Product Serial Number'
@@ -18,7 +23,8 @@ class ProductSerialNumber(models.Model):
         string='Serial Number', 
         required=True, 
         readonly=True,
-        copy=False
+        copy=False,
+        index='trigram'
     )
     
     product_tmpl_id = fields.Many2one(
@@ -68,8 +74,12 @@ class ProductSerialNumber(models.Model):
     
     qr_code = fields.Binary(
         string='QR Code',
-        compute='_compute_qr_code',
-        store=True
+        compute='_compute_qr_code'
+    )
+    
+    qr_code_url = fields.Char(
+        string='QR Code URL',
+        compute='_compute_qr_code_url'
     )
     
     # Tracking fields
@@ -85,48 +95,78 @@ class ProductSerialNumber(models.Model):
     @api.depends('name')
     def _compute_qr_code(self):
         """Generate QR Code untuk serial number"""
+        names = [name for name in self.mapped('name') if name]
+        try:
+            pngs = dict(zip(names, render_qr_png_batch(names)))
+        except Exception as e:
+            _logger.error('Error generating QR Code: %s' % str(e))
+            pngs = {}
         for record in self:
-            if record.name:
-                try:
-                    # Generate QR Code
-                    qr = qrcode.QRCode(
-                        version=1,
-                        error_correction=qrcode.constants.ERROR_CORRECT_L,
-                        box_size=10,
-                        border=4,
-                    )
-                    qr.add_data(record.name)
-                    qr.make(fit=True)
-                    
-                    img = qr.make_image(fill_color="black", back_color="white")
-                    
-                    # Convert to base64
-                    buffer = BytesIO()
-                    img.save(buffer, format='PNG')
-                    qr_code_base64 = base64.b64encode(buffer.getvalue())
-                    
-                    record.qr_code = qr_code_base64
-                except Exception as e:
-                    _logger.error('Error generating QR Code: %s' % str(e))
-                    record.qr_code = False
-            else:
-                record.qr_code = False
+            png = pngs.get(record.name)
+            record.qr_code = base64.b64encode(png) if png else False
+    
+    @api.depends('name')
+    def _compute_qr_code_url(self):
+        """URL of the QR image rendered on demand by the controller"""
+        for record in self:
+            record.qr_code_url = '/product_sn/qr/%s' % quote(record.name, safe='') if record.name else False
+    
+    @api.model
+    def _lookup_serial_candidates(self, scanned, limit=5):
+        """Resolve a scanned text to serial numbers.
+        
+        Returns the exact match when there is one, otherwise candidates: the
+        serials ending with the text (worn leading characters on a label),
+        then the closest names by trigram similarity. Backed by the trigram
+        index on ``name``.
+        """
+        scanned = (scanned or '').strip()
+        if not scanned:
+            return self.browse()
+        domain = []
+        exact = self.search(domain + [('name', '=', scanned)], limit=1)
+        if exact:
+            return exact
+        if len(scanned) >= 3:
+            suffix = self.search(domain + [('name', '=like', '%' + escape_psql(scanned))], limit=limit, order='name')
+            if suffix:
+                return suffix
+        if not self.env.registry.has_trigram:
+            return self.browse()
+        self.flush_model(['name'])
+        self.env.cr.execute("""
+            SELECT id
+              FROM product_serial_number
+             WHERE name %% %s
+          ORDER BY name <-> %s, id
+             LIMIT %s
+        """, [scanned, scanned, limit])
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        # re-apply access rules, keep the similarity order
+        allowed = set(self.search([('id', 'in', ids)]).ids)
+        return self.browse([record_id for record_id in ids if record_id in allowed])
+    
+    @api.model
+    def _read_status_counts(self, domain, groupby='product_id'):
+        """``{record of groupby: {status: count}}`` of the serial numbers in ``domain``, one grouped query"""
+        counts = {}
+        for group, status, count in self._read_group(domain, [groupby, 'status'], ['__count']):
+            counts.setdefault(group, {})[status] = count
+        return counts
     
     @api.model
     def _get_next_sequence(self, sn_type, year_code):
         """Get next sequence number for the product type and year"""
-        last_sn = self.search([
-            ('sn_type', '=', sn_type),
-            ('year_code', '=', year_code)
-        ], order='sequence_number desc', limit=1)
-        
-        if last_sn:
-            return last_sn.sequence_number + 1
-        return 1
+        return self.env['product.sn.sequence']._peek('PF', sn_type, year_code)
     
     @api.model
     def generate_serial_number(self, product_tmpl_id, product_id, sn_type, quantity=1):
-        """Generate serial numbers"""
+        """Generate serial numbers
+        
+        The sequence range is reserved once and the records are created in
+        chunks of ``GENERATE_CHUNK_SIZE`` with one multi-create each. QR
+        images are not rendered here, they are computed when displayed.
+        """
         _logger.info('=== GENERATE SERIAL NUMBER CALLED ===')
         
         product_tmpl = self.env['product.template'].browse(product_tmpl_id)
@@ -135,30 +175,37 @@ class ProductSerialNumber(models.Model):
             raise ValidationError(_('Product not found!'))
         
         current_year = datetime.now().strftime('%y')
-        group_product = 'PF'
-        serial_numbers = []
         
-        for i in range(quantity):
-            next_seq = self._get_next_sequence(sn_type, current_year)
-            serial_number = f"{group_product}{current_year}{sn_type}{next_seq:07d}"
-            
-            vals = {
-                'name': serial_number,
-                'product_tmpl_id': product_tmpl_id,
-                'sn_type': sn_type,
-                'year_code': current_year,
-                'sequence_number': next_seq,
-                'status': 'available',
-                'qc_passed': True
-            }
-            
-            if product_id:
-                vals['product_id'] = product_id
-            
-            sn_record = self.create(vals)
-            serial_numbers.append(sn_record)
+        # Reserve the whole range at once, no scan of the current maximum
+        first_seq = self.env['product.sn.sequence']._reserve('PF', sn_type, current_year, quantity)
+        return self._create_serial_range(product_tmpl_id, product_id, sn_type, current_year, first_seq, quantity)
+    
+    @api.model
+    def _create_serial_range(self, product_tmpl_id, product_id, sn_type, year_code, first_seq, quantity):
+        """Create the serials ``first_seq`` ... ``first_seq + quantity - 1`` of an already reserved range"""
+        group_product = 'PF'
+        serial_numbers = self.browse()
+        for chunk_start in range(first_seq, first_seq + quantity, GENERATE_CHUNK_SIZE):
+            chunk_end = min(chunk_start + GENERATE_CHUNK_SIZE, first_seq + quantity)
+            vals_list = []
+            for next_seq in range(chunk_start, chunk_end):
+                vals = {
+                    'name': f"{group_product}{year_code}{sn_type}{next_seq:07d}",
+                    'product_tmpl_id': product_tmpl_id,
+                    'sn_type': sn_type,
+                    'year_code': year_code,
+                    'sequence_number': next_seq,
+                    'status': 'available',
+                    'qc_passed': True
+                }
+                if product_id:
+                    vals['product_id'] = product_id
+                vals_list.append(vals)
             
-            _logger.info('Created SN: %s' % serial_number)
+            serial_numbers |= self.create(vals_list)
+            done = chunk_end - first_seq
+            _logger.info('Created SN %s ... %s (%d/%d)' % (
+                vals_list[0]['name'], vals_list[-1]['name'], done, quantity))
         
         return serial_numbers
     
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api, _
+from datetime import datetime
+import logging
+import time
+
+from .serial_number import GENERATE_CHUNK_SIZE
+
+_logger = logging.getLogger(__name__)
+
+# Seconds a cron run keeps creating chunks before handing over
+JOB_TIME_BUDGET = 60
+
+
+class ProductSNGenerateJob(models.Model):
+    """Large serial number generations, created by cron one chunk per transaction.
+    
+    The whole sequence range is reserved when the job is queued, so the
+    serials of a job stay consecutive. ``done_count`` is committed after
+    every chunk, the job form shows the progress while the run goes on.
+    """
+    _name = 'product.sn.generate.job'
+    _description = 'Serial Number Generation Job'
+    _order = 'id desc'
+    
+    name = fields.Char(string='Description', required=True, readonly=True)
+    product_tmpl_id = fields.Many2one('product.template', string='Product Template', required=True, readonly=True)
+    product_id = fields.Many2one('product.product', string='Product Variant', readonly=True)
+    sn_type = fields.Selection([
+        ('M', 'Man'),
+        ('W', 'Woman')
+    ], string='Product Type', required=True, readonly=True)
+    year_code = fields.Char(string='Year Code', size=2, required=True, readonly=True)
+    first_sequence = fields.Integer(string='First Sequence', required=True, readonly=True)
+    quantity = fields.Integer(string='Quantity', required=True, readonly=True)
+    done_count = fields.Integer(string='Generated', readonly=True)
+    progress = fields.Float(string='Progress (%)', compute='_compute_progress')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, readonly=True, index=True)
+    user_id = fields.Many2one('res.users', string='Requested By', default=lambda self: self.env.user, readonly=True)
+    error = fields.Text(string='Error', readonly=True)
+    date_done = fields.Datetime(string='Finished', readonly=True)
+    
+    @api.depends('done_count', 'quantity')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = 100.0 * job.done_count / job.quantity if job.quantity else 0.0
+    
+    @api.model
+    def _enqueue(self, product_tmpl_id, product_id, sn_type, quantity):
+        """Reserve the range, create a pending job and wake the cron up"""
+        year_code = datetime.now().strftime('%y')
+        first_seq = self.env['product.sn.sequence']._reserve('PF', sn_type, year_code, quantity)
+        job = self.create({
+            'name': _('%d serial numbers PF%s%s%07d ... PF%s%s%07d') % (
+                quantity, year_code, sn_type, first_seq, year_code, sn_type, first_seq + quantity - 1),
+            'product_tmpl_id': product_tmpl_id,
+            'product_id': product_id,
+            'sn_type': sn_type,
+            'year_code': year_code,
+            'first_sequence': first_seq,
+            'quantity': quantity,
+        })
+        self._trigger_cron()
+        _logger.info('Queued SN generation job %s (%d serials)' % (job.id, quantity))
+        return job
+    
+    @api.model
+    def _trigger_cron(self):
+        cron = self.env.ref('brodher_product_Sn.ir_cron_sn_generate_job', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+    
+    def _claim_next(self):
+        """Lock one unfinished job for this transaction, skipping the ones other workers hold"""
+        self.env.cr.execute("""
+            SELECT id
+              FROM product_sn_generate_job
+             WHERE state IN ('pending', 'running')
+          ORDER BY id
+             LIMIT 1
+               FOR UPDATE SKIP LOCKED
+        """)
+        row = self.env.cr.fetchone()
+        return self.browse(row[0]) if row else self.browse()
+    
+    @api.model
+    def _cron_run_jobs(self):
+        deadline = time.monotonic() + JOB_TIME_BUDGET
+        while time.monotonic() < deadline:
+            job = self._claim_next()
+            if not job:
+                return
+            job._run_chunk()
+            self.env.cr.commit()
+        # time budget used up, hand the rest over to the next run
+        self._trigger_cron()
+    
+    def _run_chunk(self):
+        self.ensure_one()
+        quantity = min(GENERATE_CHUNK_SIZE, self.quantity - self.done_count)
+        try:
+            with self.env.cr.savepoint():
+                self.env['product.serial.number'].with_user(self.user_id)._create_serial_range(
+                    self.product_tmpl_id.id, self.product_id.id, self.sn_type, self.year_code,
+                    self.first_sequence + self.done_count, quantity,
+                )
+        except Exception as e:
+            _logger.exception('SN generation job %s failed' % self.id)
+            self.write({'state': 'failed', 'error': str(e), 'date_done': fields.Datetime.now()})
+            return
+        
+        vals = {'done_count': self.done_count + quantity, 'state': 'running'}
+        if vals['done_count'] >= self.quantity:
+            vals.update({'state': 'done', 'date_done': fields.Datetime.now()})
+        self.write(vals)
+    
+    def action_retry(self):
+        """Continue failed jobs where they stopped, the range is still reserved"""
+        self.filtered(lambda job: job.state == 'failed').write({'state': 'pending', 'error': False, 'date_done': False})
+        self._trigger_cron()
+    
+    def action_view_serial_numbers(self):
+        self.ensure_one()
+        return {
+            'name': _('Serial Numbers'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'product.serial.number',
+            'view_mode': 'list,form',
+            'domain': [
+                ('sn_type', '=', self.sn_type),
+                ('year_code', '=', self.year_code),
+                ('sequence_number', '>=', self.first_sequence),
+                ('sequence_number', '<', self.first_sequence + self.quantity),
+            ],
+        }
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+
+
+class ProductSNSequence(models.Model):
+    _name = 'product.sn.sequence'
+    _description = 'Product Serial Number Sequence Counter'
+    _rec_name = 'prefix'
+    
+    prefix = fields.Char(string='Prefix', required=True, readonly=True)
+    sn_type = fields.Selection([
+        ('M', 'Man'),
+        ('W', 'Woman')
+    ], string='Product Type', required=True, readonly=True)
+    year_code = fields.Char(string='Year Code', size=2, required=True, readonly=True)
+    number_next = fields.Integer(string='Next Number', required=True, readonly=True, default=1)
+    
+    _sql_constraints = [
+        ('unique_counter_key',
+         'unique(prefix, sn_type, year_code)',
+         'Only one sequence counter is allowed per prefix, type and year!'),
+    ]
+    
+    @api.model
+    def _reserve(self, prefix, sn_type, year_code, quantity=1):
+        """Atomically reserve ``quantity`` numbers and return the first one
+        
+        The counter row is updated in its own short transaction so that
+        parallel generators never receive overlapping ranges.
+        """
+        with self.env.registry.cursor() as cr:
+            cr.execute("""
+                UPDATE product_sn_sequence
+                   SET number_next = number_next + %s,
+                       write_uid = %s,
+                       write_date = now() at time zone 'UTC'
+                 WHERE prefix = %s
+                   AND sn_type = %s
+                   AND year_code = %s
+             RETURNING number_next - %s
+            """, (quantity, self.env.uid, prefix, sn_type, year_code, quantity))
+            row = cr.fetchone()
+            if not row:
+                row = [self._seed(cr, prefix, sn_type, year_code, quantity)]
+        return row[0]
+    
+    @api.model
+    def _peek(self, prefix, sn_type, year_code):
+        """Return the next number without reserving it, seeding the counter
+        once if it does not exist yet"""
+        self.env.cr.execute("""
+            SELECT number_next
+              FROM product_sn_sequence
+             WHERE prefix = %s AND sn_type = %s AND year_code = %s
+        """, (prefix, sn_type, year_code))
+        row = self.env.cr.fetchone()
+        if row:
+            return row[0]
+        with self.env.registry.cursor() as cr:
+            return self._seed(cr, prefix, sn_type, year_code, 0)
+    
+    @api.model
+    def _seed(self, cr, prefix, sn_type, year_code, quantity):
+        """First use of a counter: seed it from existing serial numbers,
+        reserving ``quantity`` numbers, and return the first reserved one"""
+        cr.execute("""
+            INSERT INTO product_sn_sequence
+                   (prefix, sn_type, year_code, number_next,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT %(prefix)s, %(sn_type)s, %(year_code)s,
+                   COALESCE(MAX(sn.sequence_number), 0) + 1 + %(quantity)s,
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM product_serial_number sn
+             WHERE sn.sn_type = %(sn_type)s
+               AND sn.year_code = %(year_code)s
+            ON CONFLICT (prefix, sn_type, year_code)
+            DO UPDATE SET number_next = product_sn_sequence.number_next + %(quantity)s
+         RETURNING number_next - %(quantity)s
+        """, {
+            'prefix': prefix,
+            'sn_type': sn_type,
+            'year_code': year_code,
+            'quantity': quantity,
+            'uid': self.env.uid,
+        })
+        return cr.fetchone()[0]
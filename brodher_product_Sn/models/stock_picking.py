@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from odoo.tools.sql import create_index, drop_index
 
 class StockPicking(models.Model):
     _inherit = 'stock.picking'
@@ -13,31 +14,53 @@ class StockPicking(models.Model):
     
     sn_count = fields.Integer(
         string='SN Count',
-        compute='_compute_sn_count'
+        compute='_compute_sn_count',
+        store=True
     )
     
     scanned_sn_count = fields.Integer(
         string='Scanned SN',
-        compute='_compute_scanned_sn_count'
+        compute='_compute_sn_count',
+        store=True
     )
     
     require_sn_scan = fields.Boolean(
         string='Require SN Scan',
         compute='_compute_require_sn_scan',
+        store=True,
+        index=True,
         help='True if this picking contains products with serial numbers'
     )
     
-    @api.depends('sn_move_ids')
-    def _compute_sn_count(self):
-        for picking in self:
-            picking.sn_count = len(picking.sn_move_ids)
+    sn_scan_pending = fields.Boolean(
+        string='SN Scan Pending',
+        compute='_compute_sn_scan_pending',
+        store=True,
+        help='True while fewer serial numbers are scanned than the SN products require'
+    )
+    
+    def init(self):
+        super().init()
+        # open pickings still waiting for scans, see the 'Pending SN Scan' filter
+        # nama lama dipakai juga oleh brodher_product_serial, tiap modul punya index sendiri
+        drop_index(self.env.cr, 'stock_picking_sn_scan_pending_index', self._table)
+        create_index(
+            self.env.cr, 'stock_picking_product_sn_scan_pending_index', self._table,
+            ['picking_type_id', 'id'], where='sn_scan_pending IS TRUE',
+        )
     
     @api.depends('sn_move_ids')
-    def _compute_scanned_sn_count(self):
+    def _compute_sn_count(self):
+        counts = {}
+        picking_ids = [picking_id for picking_id in self._origin.ids if picking_id]
+        if picking_ids:
+            counts = dict(self.env['product.sn.move']._read_group(
+                [('picking_id', 'in', picking_ids)], ['picking_id'], ['__count'],
+            ))
         for picking in self:
-            picking.scanned_sn_count = len(picking.sn_move_ids)
+            picking.sn_count = picking.scanned_sn_count = counts.get(picking._origin, 0)
     
-    @api.depends('move_ids_without_package', 'move_ids_without_package.product_id')
+    @api.depends('move_ids.product_id.product_tmpl_id.sn_product_type')
     def _compute_require_sn_scan(self):
         for picking in self:
             # Check if any product in this picking has SN type
@@ -47,6 +70,19 @@ class StockPicking(models.Model):
             )
             picking.require_sn_scan = has_sn_product
     
+    @api.depends('require_sn_scan', 'state', 'scanned_sn_count', 'move_ids.product_uom_qty',
+                 'move_ids.product_id.sn_product_type')
+    def _compute_sn_scan_pending(self):
+        for picking in self:
+            if not picking.require_sn_scan or picking.state not in ('confirmed', 'assigned'):
+                picking.sn_scan_pending = False
+                continue
+            required_qty = sum(
+                int(move.product_uom_qty) for move in picking.move_ids_without_package
+                if move.product_id.product_tmpl_id.sn_product_type
+            )
+            picking.sn_scan_pending = picking.scanned_sn_count < required_qty
+    
     def action_scan_serial_number(self):
         """Open wizard to scan serial number"""
         self.ensure_one()
@@ -6,6 +6,11 @@ import logging
 
 _logger = logging.getLogger(__name__)
 
+# Above this quantity the serials are generated by a background job
+GENERATE_INLINE_LIMIT = 1000
+# Upper bound of one generation, inline or in the background
+GENERATE_MAX_QUANTITY = 1000000
+
 class ProductSNWizard(models.TransientModel):
     _name = 'product.sn.wizard'
     _description = 'Product Serial Number Generation Wizard'
@@ -79,8 +84,25 @@ class ProductSNWizard(models.TransientModel):
             if wizard.quantity <= 0:
                 raise UserError(_('Quantity must be greater than 0!'))
             
-            if wizard.quantity > 1000:
-                raise UserError(_('Cannot generate more than 1000 serial numbers at once!'))
+            if wizard.quantity > GENERATE_MAX_QUANTITY:
+                raise UserError(_('Cannot generate more than %d serial numbers at once!') % GENERATE_MAX_QUANTITY)
+            
+            if wizard.quantity > GENERATE_INLINE_LIMIT:
+                # Terlalu banyak untuk satu request: jalankan di background, progress di job
+                job = self.env['product.sn.generate.job']._enqueue(
+                    wizard.product_tmpl_id.id,
+                    wizard.product_id.id if wizard.product_id else False,
+                    wizard.sn_type,
+                    wizard.quantity,
+                )
+                return {
+                    'name': _('SN Generation Job'),
+                    'type': 'ir.actions.act_window',
+                    'res_model': 'product.sn.generate.job',
+                    'res_id': job.id,
+                    'view_mode': 'form',
+                    'target': 'current',
+                }
             
             # Generate Serial Numbers
             try:
@@ -97,9 +119,8 @@ class ProductSNWizard(models.TransientModel):
                 
                 _logger.info('Generated %d serial numbers' % len(serial_numbers))
                 
-                # List generated SNs
-                sn_names = [sn.name for sn in serial_numbers]
-                _logger.info('Serial Numbers: %s' % ', '.join(sn_names))
+                sn_names = serial_numbers.mapped('name')
+                _logger.info('Serial Numbers: %s ... %s' % (sn_names[0], sn_names[-1]))
                 
                 # Prepare message
                 if len(serial_numbers) <= 10:
@@ -252,12 +252,14 @@ class ScanSNWizard(models.TransientModel):
             if not self.scanned_sn:
                 raise UserError(_('Please scan or enter serial number!'))
             
-            sn = self.env['product.serial.number'].search([
-                ('name', '=', self.scanned_sn)
-            ], limit=1)
+            candidates = self.env['product.serial.number']._lookup_serial_candidates(self.scanned_sn)
+            sn = candidates if len(candidates) == 1 and candidates.name == self.scanned_sn.strip() else None
             
             if not sn:
-                raise ValidationError(_('Serial Number %s not found in the system!') % self.scanned_sn)
+                message = _('Serial Number %s not found in the system!') % self.scanned_sn
+                if candidates:
+                    message += _('\n\nDid you mean:\n%s') % '\n'.join('- %s' % name for name in candidates.mapped('name'))
+                raise ValidationError(message)
         
         else:  # manual
             if not self.serial_number_id:
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'Brodher Product Serial Number',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.2.0',
     'category': 'Inventory/Inventory',
     'summary': 'Custom Serial Number Generator with QR Code',
     'description': """
@@ -11,21 +11,26 @@
         Features:
         ---------
         * Generate custom serial numbers (Format: PF + Year + Type + Sequence)
-        * Auto-generate QR codes for all serial numbers
+        * QR codes rendered on demand for all serial numbers
         * Scan serial numbers via QR code or manual selection
         * Track serial number movements (in/out/internal)
         * Support multi-step warehouse operations
         * Integration with Purchase and Sales orders
         * Custom reports with QR code labels
+        * Dense label sheets (A4 3x8, A4 4x10) and 50x30 mm roll labels
+        * Raw ZPL labels for Zebra thermal printers
+        * SN statistics pivot per product, type, year, status and warehouse
+        * Large generations, label runs and bulk scans run as background jobs
         * Product type classification (Man/Woman)
     """,
     'author': 'Brodher',
     'website': 'https://www.brodher.com',
     'license': 'LGPL-3',
-    'depends': ['product', 'stock', 'purchase', 'sale'],
+    'depends': ['mail', 'product', 'stock', 'purchase', 'sale', 'brodher_qr_base'],
     'external_dependencies': {'python': ['qrcode', 'pillow']},
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'wizard/message_wizard_views.xml',
         'wizard/product_sn_wizard_views.xml',
         'wizard/scan_sn_wizard_views.xml',
@@ -34,9 +39,19 @@
         'views/stock_lot_views.xml',
         'views/stock_picking_views.xml',
         'views/sn_move_views.xml',
+        'views/sn_state_views.xml',
+        'views/sn_report_views.xml',
+        'views/sn_job_views.xml',
         'reports/sn_qr_label_report.xml',
+        'reports/sn_label_sheet_report.xml',
+        'reports/sn_zpl_label_report.xml',
         'reports/stock_picking_qrcode_report.xml',
     ],
+    'assets': {
+        'web.assets_backend': [
+            'brodher_product_serial/static/src/**/*',
+        ],
+    },
     'installable': True,
     'application': False,
     'auto_install': False,
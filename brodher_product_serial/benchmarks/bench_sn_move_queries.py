@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""Query plan benchmark of the brodher.sn.move lookups, before and after the index set.
+
+Needs a PostgreSQL database the user can create schemas in, no Odoo server::
+
+    python brodher_product_serial/benchmarks/bench_sn_move_queries.py \\
+        --dsn "dbname=bench" --moves 3000000
+
+The script creates a scratch schema holding a trimmed copy of the tables
+(stock_lot, stock_picking, brodher_sn_move), fills it with synthetic
+receipts and deliveries, then runs every query with EXPLAIN ANALYZE before
+and after creating the indexes of ``BrodherSNMove.init``. The schema is
+dropped at the end unless ``--keep`` is given.
+"""
+import argparse
+import json
+import random
+
+import psycopg2
+
+SCHEMA = 'brodher_sn_bench'
+
+TABLES = """
+    CREATE TABLE stock_lot (
+        id serial PRIMARY KEY,
+        name varchar NOT NULL,
+        product_id integer NOT NULL
+    );
+    CREATE TABLE stock_picking (
+        id serial PRIMARY KEY,
+        name varchar NOT NULL,
+        state varchar NOT NULL
+    );
+    CREATE TABLE brodher_sn_move (
+        id serial PRIMARY KEY,
+        serial_number_id integer NOT NULL,
+        serial_number_name varchar,
+        move_type varchar NOT NULL,
+        move_date timestamp,
+        user_id integer,
+        picking_id integer,
+        picking_state varchar,
+        product_tmpl_id integer,
+        CONSTRAINT brodher_sn_move_unique_sn_per_picking UNIQUE (serial_number_id, picking_id)
+    );
+"""
+
+# Keep in sync with BrodherSNMove._init_lookup_indexes
+INDEXES = """
+    CREATE INDEX brodher_sn_move_serial_type_state_index
+        ON brodher_sn_move (serial_number_id, move_type, picking_state);
+    CREATE INDEX brodher_sn_move_picking_tmpl_index
+        ON brodher_sn_move (picking_id, product_tmpl_id);
+    CREATE UNIQUE INDEX brodher_sn_move_unique_done_receipt
+        ON brodher_sn_move (serial_number_id)
+        WHERE move_type = 'in' AND picking_state = 'done';
+"""
+
+# Every SN is received once; ``--out-percent`` of them are shipped later.
+# Pickings hold ``--picking-size`` moves and rows are inserted in date order.
+FILL = """
+    INSERT INTO stock_lot (name, product_id)
+         SELECT 'PF25W' || lpad(n::text, 7, '0'), 1 + n %% %(products)s
+           FROM generate_series(1, %(lots)s) n;
+
+    INSERT INTO stock_picking (name, state)
+         SELECT 'WH/' || n, CASE WHEN n %% 50 = 0 THEN 'assigned' ELSE 'done' END
+           FROM generate_series(1, %(pickings)s) n;
+
+    INSERT INTO brodher_sn_move (serial_number_id, serial_number_name, move_type, move_date,
+                                 user_id, picking_id, product_tmpl_id)
+         SELECT lot.id, lot.name, moves.move_type,
+                timestamp '2024-01-01' + (moves.seq * interval '10 seconds'),
+                2, 1 + (moves.seq - 1) / %(picking_size)s, lot.product_id
+           FROM (
+                SELECT n AS lot_id, 'in' AS move_type, n AS seq
+                  FROM generate_series(1, %(lots)s) n
+                 UNION ALL
+                SELECT n, 'out', %(lots)s + row_number() OVER (ORDER BY n)
+                  FROM generate_series(1, %(lots)s) n
+                 WHERE n %% 100 < %(out_percent)s
+           ) moves
+           JOIN stock_lot lot ON lot.id = moves.lot_id;
+
+    UPDATE brodher_sn_move move
+       SET picking_state = picking.state
+      FROM stock_picking picking
+     WHERE picking.id = move.picking_id;
+"""
+
+# (label, query) pairs, %(lot)s / %(lots)s / %(picking)s are filled per run
+QUERIES = [
+    ('scan wizard: already scanned in picking', """
+        SELECT id FROM brodher_sn_move
+         WHERE picking_id = %(picking)s AND serial_number_id = ANY(%(lots)s)
+    """),
+    ('scan wizard: per product counters', """
+        SELECT picking_id, product_tmpl_id, COUNT(*) FROM brodher_sn_move
+         WHERE picking_id = %(picking)s
+      GROUP BY picking_id, product_tmpl_id
+    """),
+    ('validation: done receipt of SN', """
+        SELECT id FROM brodher_sn_move
+         WHERE serial_number_id = %(lot)s AND move_type = 'in' AND picking_state = 'done'
+         LIMIT 1
+    """),
+    ('validation: done delivery of SN', """
+        SELECT id FROM brodher_sn_move
+         WHERE serial_number_id = %(lot)s AND move_type = 'out' AND picking_state = 'done'
+         LIMIT 1
+    """),
+    ('history: latest moves of SN', """
+        SELECT move_type, picking_id, picking_state, move_date FROM brodher_sn_move
+         WHERE serial_number_id = %(lot)s
+      ORDER BY move_date DESC
+         LIMIT 20
+    """),
+    ('report: one day of moves', """
+        SELECT move_type, COUNT(*) FROM brodher_sn_move
+         WHERE move_date >= timestamp '2024-01-02' AND move_date < timestamp '2024-01-03'
+      GROUP BY move_type
+    """),
+]
+
+
+def explain(cr, query, params, repeat):
+    """Best execution time (ms) over ``repeat`` runs and the top plan node"""
+    best, node = None, None
+    for _run in range(repeat):
+        cr.execute('EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + query, params)
+        plan = cr.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        elapsed = plan[0]['Execution Time']
+        if best is None or elapsed < best:
+            best, node = elapsed, plan[0]['Plan']
+    while node.get('Plans') and node['Node Type'] in ('Limit', 'Aggregate', 'Sort', 'Gather'):
+        node = node['Plans'][0]
+    return best, '%s%s' % (node['Node Type'], ' on %s' % node['Index Name'] if node.get('Index Name') else '')
+
+
+def run_queries(cr, args, rng):
+    lots = args.moves * 100 // (100 + args.out_percent)
+    pickings = args.moves // args.picking_size + 1
+    params = {
+        'lot': rng.randint(1, lots),
+        'lots': [rng.randint(1, lots) for _i in range(args.picking_size)],
+        'picking': rng.randint(1, pickings),
+    }
+    return [(label, explain(cr, query, params, args.repeat)) for label, query in QUERIES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dsn', default='dbname=postgres', help='libpq connection string')
+    parser.add_argument('--moves', type=int, default=3000000, help='approximate number of SN moves to load')
+    parser.add_argument('--picking-size', type=int, default=200, help='SN moves per picking')
+    parser.add_argument('--out-percent', type=int, default=60, help='share of received SNs shipped again')
+    parser.add_argument('--products', type=int, default=300, help='number of distinct products')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per query, the best one is kept')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep', action='store_true', help='keep the scratch schema')
+    args = parser.parse_args()
+
+    lots = args.moves * 100 // (100 + args.out_percent)
+    connection = psycopg2.connect(args.dsn)
+    connection.autocommit = True
+    cr = connection.cursor()
+    try:
+        cr.execute('DROP SCHEMA IF EXISTS %s CASCADE; CREATE SCHEMA %s' % (SCHEMA, SCHEMA))
+        cr.execute('SET search_path TO %s' % SCHEMA)
+        cr.execute(TABLES)
+        print(f'loading {args.moves} moves ...')
+        cr.execute(FILL, {
+            'lots': lots,
+            'pickings': args.moves // args.picking_size + 1,
+            'picking_size': args.picking_size,
+            'products': args.products,
+            'out_percent': args.out_percent,
+        })
+        cr.execute('VACUUM ANALYZE')
+
+        before = run_queries(cr, args, random.Random(args.seed))
+        cr.execute(INDEXES)
+        cr.execute('VACUUM ANALYZE')
+        after = run_queries(cr, args, random.Random(args.seed))
+
+        print(f'{"query":<42} {"before ms":>10} {"after ms":>10} {"speedup":>8}  plan after')
+        for (label, (ms_before, _plan)), (_label, (ms_after, plan_after)) in zip(before, after):
+            print(f'{label:<42} {ms_before:>10.2f} {ms_after:>10.2f} {ms_before / max(ms_after, 0.001):>7.1f}x  {plan_after}')
+    finally:
+        if not args.keep:
+            cr.execute('DROP SCHEMA IF EXISTS %s CASCADE' % SCHEMA)
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
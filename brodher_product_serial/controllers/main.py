@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from odoo import http
+from odoo.http import request
+
+from odoo.addons.brodher_qr_base.controllers.main import qr_png_response
+
+
+class SerialNumberQRController(http.Controller):
+
+    @http.route('/brodher/sn/qr/<string:name>', type='http', auth='user', methods=['GET'])
+    def serial_number_qr(self, name, **kwargs):
+        """Render the QR image of a serial number on demand"""
+        return qr_png_response(name)
+
+    @http.route('/brodher/sn/scan', type='json', auth='user', methods=['POST'])
+    def serial_number_scan(self, picking_id, serial_number, move_type=None, notes=None, with_progress=False, **kwargs):
+        """Register one scanned serial number on a picking.
+
+        Meant for handheld scanners and the scan wizard: one small JSON round
+        trip per scan instead of reopening the scan wizard form. Pass
+        ``with_progress`` to also get the expected vs scanned table.
+        """
+        try:
+            picking = request.env['stock.picking'].browse(int(picking_id)).exists()
+        except (TypeError, ValueError):
+            picking = request.env['stock.picking']
+        if not picking:
+            return {
+                'status': 'error',
+                'code': 'picking_not_found',
+                'message': 'Picking %s not found' % picking_id,
+                'serial_number': serial_number,
+            }
+        return picking._scan_sn_json(
+            (serial_number or '').strip(), move_type, notes=notes, with_progress=bool(with_progress),
+        )
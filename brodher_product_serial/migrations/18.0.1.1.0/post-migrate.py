@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """stock.lot.qr_code is no longer stored: drop the rendered PNG attachments"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    attachments = env['ir.attachment'].search([
+        ('res_model', '=', 'stock.lot'),
+        ('res_field', '=', 'qr_code'),
+    ])
+    attachments.unlink()
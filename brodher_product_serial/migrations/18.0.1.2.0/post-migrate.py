@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Fill the new SN stock state table from the existing move history"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['brodher.sn.state']._rebuild()
@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 from . import product_template
 from . import product_product
+from . import sn_sequence
 from . import stock_lot
 from . import stock_picking
+from . import stock_picking_type
+from . import stock_move
+from . import stock_move_line
 from . import sn_move
+from . import sn_state
+from . import sn_report
+from . import sn_job
 from . import purchase_order
 from . import sale_order
\ No newline at end of file
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
+from odoo.tools.sql import create_index
 
 class ProductProduct(models.Model):
     _inherit = 'product.product'
@@ -12,11 +13,27 @@ class ProductProduct(models.Model):
     serial_count = fields.Integer(
         string='Serial Numbers', compute='_compute_serial_count'
     )
+    serial_available_count = fields.Integer(string='Available SN', compute='_compute_serial_count')
+    serial_used_count = fields.Integer(string='Used SN', compute='_compute_serial_count')
+    serial_reserved_count = fields.Integer(string='Reserved SN', compute='_compute_serial_count')
+    
+    def init(self):
+        super().init()
+        # partial code search next to the SN name lookups
+        if self.env.registry.has_trigram:
+            create_index(self.env.cr, 'product_product_default_code_trgm_index', self._table,
+                         ['default_code gin_trgm_ops'], method='gin')
     
     @api.depends('serial_number_ids')
     def _compute_serial_count(self):
+        product_ids = [product_id for product_id in self._origin.ids if product_id]
+        counts = self.env['stock.lot']._read_sn_status_counts([('product_id', 'in', product_ids)]) if product_ids else {}
         for record in self:
-            record.serial_count = len(record.serial_number_ids.filtered(lambda sn: sn.sn_type))
+            by_status = counts.get(record._origin, {})
+            record.serial_count = sum(by_status.values())
+            record.serial_available_count = by_status.get('available', 0)
+            record.serial_used_count = by_status.get('used', 0)
+            record.serial_reserved_count = by_status.get('reserved', 0)
     
     def action_generate_serial_numbers(self):
         self.ensure_one()
@@ -18,11 +18,26 @@ class ProductTemplate(models.Model):
     serial_count = fields.Integer(
         string='Serial Numbers', compute='_compute_serial_count'
     )
+    serial_available_count = fields.Integer(string='Available SN', compute='_compute_serial_count')
+    serial_used_count = fields.Integer(string='Used SN', compute='_compute_serial_count')
+    serial_reserved_count = fields.Integer(string='Reserved SN', compute='_compute_serial_count')
     
     @api.depends('serial_number_ids')
     def _compute_serial_count(self):
+        tmpl_ids = [tmpl_id for tmpl_id in self._origin.ids if tmpl_id]
+        by_template = {}
+        if tmpl_ids:
+            counts = self.env['stock.lot']._read_sn_status_counts([('product_id.product_tmpl_id', 'in', tmpl_ids)])
+            for product, by_status in counts.items():
+                totals = by_template.setdefault(product.product_tmpl_id.id, {})
+                for status, count in by_status.items():
+                    totals[status] = totals.get(status, 0) + count
         for record in self:
-            record.serial_count = len(record.serial_number_ids.filtered(lambda sn: sn.sn_type))
+            by_status = by_template.get(record._origin.id, {})
+            record.serial_count = sum(by_status.values())
+            record.serial_available_count = by_status.get('available', 0)
+            record.serial_used_count = by_status.get('used', 0)
+            record.serial_reserved_count = by_status.get('reserved', 0)
     
     def action_generate_serial_numbers(self):
         self.ensure_one()
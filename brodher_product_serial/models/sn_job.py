@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from markupsafe import Markup
+import base64
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Seconds a cron run keeps claiming chunks before handing over
+JOB_TIME_BUDGET = 60
+# Seconds before a failed chunk is tried again
+JOB_RETRY_DELAY = 300
+# Runner crons, one per cron worker that may process jobs in parallel
+JOB_RUNNER_CRONS = (
+    'brodher_product_serial.ir_cron_sn_job_runner',
+    'brodher_product_serial.ir_cron_sn_job_runner_2',
+    'brodher_product_serial.ir_cron_sn_job_runner_3',
+)
+# Units processed per chunk, one transaction each
+JOB_CHUNK_SIZE = {
+    'generate_sn': 5000,
+    'render_labels': 500,
+    'bulk_receipt': 1000,
+}
+
+
+class BrodherSNJob(models.Model):
+    """Long SN operations run by cron, one chunk per transaction.
+    
+    Runner crons claim jobs with SELECT ... FOR UPDATE SKIP LOCKED, so every
+    cron worker can pick a different job (or the next chunk of the same job
+    once the previous chunk is committed).
+    """
+    _name = 'brodher.sn.job'
+    _description = 'Serial Number Background Job'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+    
+    name = fields.Char(string='Description', required=True, readonly=True)
+    job_type = fields.Selection([
+        ('generate_sn', 'Generate Serial Numbers'),
+        ('render_labels', 'Render QR Labels'),
+        ('bulk_receipt', 'Bulk SN Scan'),
+    ], string='Job Type', required=True, readonly=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, readonly=True, tracking=True, index=True)
+    payload = fields.Json(string='Payload', readonly=True)
+    user_id = fields.Many2one('res.users', string='Requested By', default=lambda self: self.env.user, readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company, readonly=True)
+    
+    total_count = fields.Integer(string='Total', readonly=True)
+    done_count = fields.Integer(string='Processed', readonly=True)
+    progress = fields.Float(string='Progress (%)', compute='_compute_progress')
+    attempts = fields.Integer(string='Attempts', readonly=True)
+    max_attempts = fields.Integer(string='Max Attempts', default=3)
+    error = fields.Text(string='Last Error', readonly=True)
+    date_retry = fields.Datetime(string='Retry After', readonly=True)
+    date_started = fields.Datetime(string='Started', readonly=True)
+    date_done = fields.Datetime(string='Finished', readonly=True)
+    
+    @api.depends('done_count', 'total_count')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = 100.0 * job.done_count / job.total_count if job.total_count else 0.0
+    
+    @api.model
+    def _enqueue(self, job_type, name, payload, total):
+        """Create a pending job and wake the runners up"""
+        job = self.create({
+            'name': name,
+            'job_type': job_type,
+            'payload': payload,
+            'total_count': total,
+        })
+        self._trigger_runners()
+        _logger.info('Queued SN job %s (%s, %d units)' % (job.id, job_type, total))
+        return job
+    
+    def _action_notify_queued(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Queued'),
+                'message': _('%s runs in the background, you will be notified when it is done.') % self.name,
+                'type': 'info',
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+    
+    def action_retry(self):
+        self.filtered(lambda job: job.state == 'failed').write({
+            'state': 'pending', 'attempts': 0, 'error': False, 'date_retry': False,
+        })
+        self._trigger_runners()
+    
+    @api.model
+    def _trigger_runners(self, at=None):
+        for xmlid in JOB_RUNNER_CRONS:
+            cron = self.env.ref(xmlid, raise_if_not_found=False)
+            if cron:
+                cron._trigger(at)
+    
+    # ------------------------------------------------------------------
+    # Runner
+    # ------------------------------------------------------------------
+    
+    def _claim_next(self):
+        """Lock one runnable job for this transaction, skipping the ones other workers hold"""
+        self.env.cr.execute("""
+            SELECT id
+              FROM brodher_sn_job
+             WHERE state IN ('pending', 'running')
+               AND (date_retry IS NULL OR date_retry <= now() at time zone 'UTC')
+          ORDER BY id
+             LIMIT 1
+               FOR UPDATE SKIP LOCKED
+        """)
+        row = self.env.cr.fetchone()
+        return self.browse(row[0]) if row else self.browse()
+    
+    @api.model
+    def _cron_run_jobs(self):
+        deadline = time.monotonic() + JOB_TIME_BUDGET
+        while time.monotonic() < deadline:
+            job = self._claim_next()
+            if not job:
+                return
+            job._run_chunk()
+            self.env.cr.commit()
+        # time budget used up, hand the rest over to the next run
+        self._trigger_runners()
+    
+    def _run_chunk(self):
+        self.ensure_one()
+        if self.state == 'pending':
+            self.write({'state': 'running', 'date_started': fields.Datetime.now()})
+        chunk_size = JOB_CHUNK_SIZE[self.job_type]
+        try:
+            # run as the requester: SN moves record who scanned, and their
+            # access rights and record rules apply
+            runner = self.with_user(self.user_id or self.env.user).with_company(self.company_id)
+            with self.env.cr.savepoint():
+                processed = getattr(runner, '_run_%s' % self.job_type)(chunk_size)
+        except Exception as e:
+            _logger.exception('SN job %s failed' % self.id)
+            attempts = self.attempts + 1
+            vals = {'attempts': attempts, 'error': str(e)}
+            if attempts >= self.max_attempts:
+                vals.update({'state': 'failed', 'date_done': fields.Datetime.now()})
+                self.write(vals)
+                self._notify_user([_('%s failed after %d attempts: %s') % (self.name, attempts, e)])
+            else:
+                vals['date_retry'] = fields.Datetime.add(fields.Datetime.now(), seconds=JOB_RETRY_DELAY)
+                self.write(vals)
+                self._trigger_runners(vals['date_retry'])
+            return
+    
+        done_count = min(self.done_count + processed, self.total_count)
+        self.write({'done_count': done_count, 'date_retry': False})
+        if done_count >= self.total_count:
+            self.write({'state': 'done', 'date_done': fields.Datetime.now()})
+            self._on_done()
+    
+    def _notify_user(self, lines, attachment_ids=None):
+        self.message_post(
+            body=Markup('<br/>').join(lines),
+            partner_ids=self.user_id.partner_id.ids,
+            attachment_ids=attachment_ids or [],
+            subtype_xmlid='mail.mt_comment',
+        )
+    
+    def _on_done(self):
+        payload = self.payload or {}
+        if self.job_type == 'bulk_receipt':
+            failures = payload.get('failures', [])
+            lines = [_('%s is done: %d registered, %d failed.') % (
+                self.name, self.total_count - len(failures), len(failures))]
+            lines += ['%s: %s' % tuple(failure) for failure in failures[:200]]
+            self._notify_user(lines)
+        elif self.job_type == 'render_labels':
+            attachments = self.env['ir.attachment'].search([
+                ('res_model', '=', self._name), ('res_id', '=', self.id),
+            ])
+            self._notify_user([_('%s is done, %d PDF file(s) attached.') % (self.name, len(attachments))], attachments.ids)
+        else:
+            self._notify_user([_('%s is done: %d serial numbers.') % (self.name, self.done_count)])
+    
+    # ------------------------------------------------------------------
+    # Job types, each processes at most ``chunk_size`` units and returns
+    # the number of units handled
+    # ------------------------------------------------------------------
+    
+    def _run_generate_sn(self, chunk_size):
+        payload = self.payload
+        quantity = min(chunk_size, self.total_count - self.done_count)
+        self.env['stock.lot'].generate_serial_numbers(
+            payload['product_tmpl_id'], payload['product_id'], payload['sn_type'], quantity,
+        )
+        return quantity
+    
+    def _run_render_labels(self, chunk_size):
+        payload = self.payload
+        lot_ids = payload['lot_ids'][self.done_count:self.done_count + chunk_size]
+        report = self.env.ref(payload['report'])
+        # spread the QR images of the chunk over all cores (0 = one worker per CPU)
+        pdf, _report_type = self.env['ir.actions.report'].with_context(
+            qr_render_workers=0,
+        )._render_qweb_pdf(report, lot_ids)
+        part = self.done_count // chunk_size + 1
+        self.env['ir.attachment'].create({
+            'name': '%s - %d.pdf' % (self.name, part),
+            'type': 'binary',
+            'datas': base64.b64encode(pdf),
+            'res_model': self._name,
+            'res_id': self.id,
+            'mimetype': 'application/pdf',
+        })
+        return len(lot_ids)
+    
+    def _run_bulk_receipt(self, chunk_size):
+        payload = dict(self.payload)
+        picking = self.env['stock.picking'].browse(payload['picking_id']).exists()
+        if not picking:
+            raise UserError(_('Picking %s no longer exists!') % payload['picking_id'])
+        names = payload['names'][self.done_count:self.done_count + chunk_size]
+        _registered, failures = picking._process_sn_bulk_scan(
+            names, payload['move_type'],
+            location_src_id=payload.get('location_src_id'),
+            location_dest_id=payload.get('location_dest_id'),
+            notes=payload.get('notes'),
+        )
+        if failures:
+            payload['failures'] = payload.get('failures', []) + [list(failure) for failure in failures]
+            self.payload = payload
+        return len(names)
@@ -1,5 +1,14 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api, _, exceptions
+from odoo import models, fields
+from odoo.tools.sql import create_index, drop_index, index_exists
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# One done receipt per serial number, see BrodherSNMove.init
+UNIQUE_DONE_RECEIPT_INDEX = 'brodher_sn_move_unique_done_receipt'
+# Indexes created by earlier versions and dropped again, never benchmarked
+DROPPED_INDEXES = ('brodher_sn_move_move_date_brin_index', 'brodher_sn_move_history_index')
 
 class BrodherSNMove(models.Model):
     _name = 'brodher.sn.move'
@@ -21,6 +30,7 @@ class BrodherSNMove(models.Model):
     user_id = fields.Many2one('res.users', string='User', default=lambda self: self.env.user)
     notes = fields.Text(string='Notes')
     picking_id = fields.Many2one('stock.picking', string='Stock Picking')
+    picking_state = fields.Selection(related='picking_id.state', string='Picking Status', store=True, index=True)
     product_tmpl_id = fields.Many2one(
         related='serial_number_id.product_id.product_tmpl_id',
         string='Product', store=True
@@ -32,29 +42,51 @@ class BrodherSNMove(models.Model):
          'This Serial Number has already been scanned in this picking!'),
     ]
     
-    @api.constrains('serial_number_id', 'move_type', 'picking_id')
-    def _check_duplicate_incoming(self):
-        """Prevent duplicate incoming for same SN"""
-        for record in self:
-            if record.move_type == 'in' and record.picking_id.state == 'done':
-                # Check if this SN already received in another DONE picking
-                existing = self.search([
-                    ('serial_number_id', '=', record.serial_number_id.id),
-                    ('move_type', '=', 'in'),
-                    ('picking_id', '!=', record.picking_id.id),
-                    ('picking_id.state', '=', 'done'),
-                    ('id', '!=', record.id)
-                ], limit=1)
-                
-                if existing:
-                    raise exceptions.ValidationError(_(
-                        'Serial Number %s has already been received!\n\n'
-                        'Previous Receipt: %s\n'
-                        'Date: %s\n'
-                        'User: %s'
-                    ) % (
-                        record.serial_number_id.name,
-                        existing.picking_id.name,
-                        existing.move_date.strftime('%Y-%m-%d %H:%M'),
-                        existing.user_id.name
-                    ))
\ No newline at end of file
+    def init(self):
+        super().init()
+        self._init_lookup_indexes()
+        self._init_unique_done_receipt_index()
+    
+    def _init_lookup_indexes(self):
+        """Indexes of the hot lookups, benchmarked by benchmarks/bench_sn_move_queries.py"""
+        cr = self.env.cr
+        # scan validation: SN + type + done pickings
+        create_index(cr, 'brodher_sn_move_serial_type_state_index', self._table,
+                     ['serial_number_id', 'move_type', 'picking_state'])
+        # picking tab, already scanned check and per product counters
+        create_index(cr, 'brodher_sn_move_picking_tmpl_index', self._table,
+                     ['picking_id', 'product_tmpl_id'])
+        for indexname in DROPPED_INDEXES:
+            drop_index(cr, indexname, self._table)
+    
+    def _init_unique_done_receipt_index(self):
+        # Race safe replacement of the old _check_duplicate_incoming constraint
+        if index_exists(self.env.cr, UNIQUE_DONE_RECEIPT_INDEX):
+            return
+        # picking_state may not be computed yet for existing rows
+        self.env.cr.execute("""
+            UPDATE brodher_sn_move move
+               SET picking_state = picking.state
+              FROM stock_picking picking
+             WHERE picking.id = move.picking_id
+               AND move.picking_state IS DISTINCT FROM picking.state
+        """)
+        self.env.cr.execute("""
+            SELECT serial_number_id
+              FROM brodher_sn_move
+             WHERE move_type = 'in' AND picking_state = 'done'
+          GROUP BY serial_number_id
+            HAVING COUNT(*) > 1
+             LIMIT 10
+        """)
+        duplicates = [row[0] for row in self.env.cr.fetchall()]
+        if duplicates:
+            _logger.warning(
+                'Index %s not created, serial numbers received more than once: %s',
+                UNIQUE_DONE_RECEIPT_INDEX, duplicates,
+            )
+            return
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX %s ON brodher_sn_move (serial_number_id)
+             WHERE move_type = 'in' AND picking_state = 'done'
+        """ % UNIQUE_DONE_RECEIPT_INDEX)
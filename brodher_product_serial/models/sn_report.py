@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api, tools
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class BrodherSNReport(models.Model):
+    """SN counts per product, type, year, status, stock state and location.
+    
+    Backed by a materialized view over stock.lot and brodher.sn.state (the
+    folded brodher.sn.move history), refreshed by cron, so dashboards never
+    scan the raw tables.
+    """
+    _name = 'brodher.sn.report'
+    _description = 'Serial Number Statistics'
+    _auto = False
+    _rec_name = 'product_id'
+    _order = 'product_id, sn_type, year_code'
+    
+    product_id = fields.Many2one('product.product', string='Product', readonly=True)
+    product_tmpl_id = fields.Many2one('product.template', string='Product Template', readonly=True)
+    sn_type = fields.Selection([
+        ('M', 'Man'),
+        ('W', 'Woman')
+    ], string='SN Type', readonly=True)
+    year_code = fields.Char(string='Year Code', readonly=True)
+    sn_status = fields.Selection([
+        ('available', 'Available'),
+        ('used', 'Used'),
+        ('reserved', 'Reserved')
+    ], string='Status', readonly=True)
+    stock_state = fields.Selection([
+        ('never_received', 'Never Received'),
+        ('in_stock', 'In Stock'),
+        ('shipped', 'Shipped')
+    ], string='Stock State', readonly=True)
+    location_id = fields.Many2one('stock.location', string='Location', readonly=True)
+    warehouse_id = fields.Many2one('stock.warehouse', string='Warehouse', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    sn_count = fields.Integer(string='Serial Numbers', readonly=True)
+    
+    def _select_query(self):
+        return """
+            SELECT row_number() OVER (
+                       ORDER BY sn.product_id, sn.sn_type, sn.year_code, sn.sn_status,
+                                sn.stock_state, sn.location_id, sn.company_id
+                   ) AS id,
+                   sn.product_id,
+                   sn.product_tmpl_id,
+                   sn.sn_type,
+                   sn.year_code,
+                   sn.sn_status,
+                   sn.stock_state,
+                   sn.location_id,
+                   sn.warehouse_id,
+                   sn.company_id,
+                   COUNT(*) AS sn_count
+              FROM (
+                    SELECT lot.product_id,
+                           product.product_tmpl_id,
+                           lot.sn_type,
+                           lot.year_code,
+                           lot.sn_status,
+                           CASE
+                               WHEN state.shipped_move_id IS NOT NULL THEN 'shipped'
+                               WHEN state.received_move_id IS NOT NULL THEN 'in_stock'
+                               ELSE 'never_received'
+                           END AS stock_state,
+                           state.location_id,
+                           location.warehouse_id,
+                           lot.company_id
+                      FROM stock_lot lot
+                      JOIN product_product product ON product.id = lot.product_id
+                 LEFT JOIN brodher_sn_state state ON state.serial_number_id = lot.id
+                 LEFT JOIN stock_location location ON location.id = state.location_id
+                     WHERE lot.sn_type IS NOT NULL
+                   ) sn
+          GROUP BY sn.product_id, sn.product_tmpl_id, sn.sn_type, sn.year_code, sn.sn_status,
+                   sn.stock_state, sn.location_id, sn.warehouse_id, sn.company_id
+        """
+    
+    def init(self):
+        self.env.cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", [self._table])
+        row = self.env.cr.fetchone()
+        if row and row[0] == 'm':
+            self.env.cr.execute("DROP MATERIALIZED VIEW %s CASCADE" % self._table)
+        else:
+            tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("CREATE MATERIALIZED VIEW %s AS (%s)" % (self._table, self._select_query()))
+        # required by REFRESH ... CONCURRENTLY
+        self.env.cr.execute("CREATE UNIQUE INDEX %s_id_index ON %s (id)" % (self._table, self._table))
+        self.env.cr.execute("CREATE INDEX %s_product_id_index ON %s (product_id)" % (self._table, self._table))
+    
+    @api.model
+    def _refresh(self):
+        """Refresh the statistics without blocking readers"""
+        self.env['brodher.sn.state'].flush_model()
+        self.env['stock.lot'].flush_model(['product_id', 'sn_type', 'year_code', 'sn_status', 'company_id'])
+        self.env.cr.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY %s" % self._table)
+        self.invalidate_model()
+        _logger.info('SN statistics refreshed')
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+
+
+class BrodherSNSequence(models.Model):
+    _name = 'brodher.sn.sequence'
+    _description = 'Serial Number Sequence Counter'
+    _rec_name = 'prefix'
+    
+    prefix = fields.Char(string='Prefix', required=True, readonly=True)
+    sn_type = fields.Selection([
+        ('M', 'Man'), ('W', 'Woman')
+    ], string='SN Type', required=True, readonly=True)
+    year_code = fields.Char(string='Year Code', size=2, required=True, readonly=True)
+    # Plain id, no foreign key: _reserve inserts from its own cursor and a FK
+    # check would wait on a product still uncommitted in the caller's transaction
+    product_id = fields.Integer(string='Product ID', required=True, readonly=True)
+    number_next = fields.Integer(string='Next Number', required=True, readonly=True, default=1)
+    
+    _sql_constraints = [
+        ('unique_counter_key',
+         'unique(prefix, sn_type, year_code, product_id)',
+         'Only one sequence counter is allowed per prefix, type, year and product!'),
+    ]
+    
+    def init(self):
+        super().init()
+        # left over from when product_id was a many2one
+        self.env.cr.execute(
+            "ALTER TABLE brodher_sn_sequence DROP CONSTRAINT IF EXISTS brodher_sn_sequence_product_id_fkey"
+        )
+    
+    @api.model
+    def _reserve(self, prefix, sn_type, year_code, product_id, quantity=1):
+        """Atomically reserve ``quantity`` numbers and return the first one.
+        
+        The counter row is updated in its own short transaction, so parallel
+        generators only wait on each other for a single UPDATE and never get
+        overlapping ranges. Numbers of a rolled back generation are not reused.
+        The counter is seeded once from the lots that already exist.
+        """
+        with self.env.registry.cursor() as cr:
+            cr.execute("""
+                UPDATE brodher_sn_sequence
+                   SET number_next = number_next + %s,
+                       write_uid = %s,
+                       write_date = now() at time zone 'UTC'
+                 WHERE prefix = %s
+                   AND sn_type = %s
+                   AND year_code = %s
+                   AND product_id = %s
+             RETURNING number_next - %s
+            """, (quantity, self.env.uid, prefix, sn_type, year_code, product_id, quantity))
+            row = cr.fetchone()
+            if not row:
+                row = [self._seed(cr, prefix, sn_type, year_code, product_id, quantity)]
+        return row[0]
+    
+    @api.model
+    def _peek(self, prefix, sn_type, year_code, product_id):
+        """Return the next number without reserving it.
+        
+        A missing counter is seeded here as well (reserving nothing), so the
+        MAX over existing lots runs once instead of on every preview.
+        """
+        self.env.cr.execute("""
+            SELECT number_next
+              FROM brodher_sn_sequence
+             WHERE prefix = %s AND sn_type = %s AND year_code = %s AND product_id = %s
+        """, (prefix, sn_type, year_code, product_id))
+        row = self.env.cr.fetchone()
+        if row:
+            return row[0]
+        with self.env.registry.cursor() as cr:
+            return self._seed(cr, prefix, sn_type, year_code, product_id, 0)
+    
+    @api.model
+    def _seed(self, cr, prefix, sn_type, year_code, product_id, quantity):
+        """Create the counter from the highest existing lot number, reserving
+        ``quantity`` numbers on it, and return the first reserved one"""
+        cr.execute("""
+            INSERT INTO brodher_sn_sequence
+                   (prefix, sn_type, year_code, product_id, number_next,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT %(prefix)s, %(sn_type)s, %(year_code)s, %(product_id)s,
+                   COALESCE(MAX(lot.sequence_number), 0) + 1 + %(quantity)s,
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM stock_lot lot
+             WHERE lot.sn_type = %(sn_type)s
+               AND lot.year_code = %(year_code)s
+               AND lot.product_id = %(product_id)s
+               AND lot.name LIKE %(pattern)s
+            ON CONFLICT (prefix, sn_type, year_code, product_id)
+            DO UPDATE SET number_next = brodher_sn_sequence.number_next + %(quantity)s
+         RETURNING number_next - %(quantity)s
+        """, {
+            'prefix': prefix,
+            'sn_type': sn_type,
+            'year_code': year_code,
+            'product_id': product_id,
+            'quantity': quantity,
+            'uid': self.env.uid,
+            'pattern': f'{prefix}{year_code}{sn_type}%',
+        })
+        return cr.fetchone()[0]
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+
+
+class BrodherSNState(models.Model):
+    _name = 'brodher.sn.state'
+    _description = 'Serial Number Stock State'
+    _rec_name = 'serial_number_id'
+    _order = 'last_move_date desc, id desc'
+    
+    serial_number_id = fields.Many2one('stock.lot', string='Serial Number', required=True, ondelete='cascade', index=True)
+    serial_number_name = fields.Char(related='serial_number_id.name', string='SN')
+    product_id = fields.Many2one(related='serial_number_id.product_id', string='Product', store=True, index=True)
+    
+    received_move_id = fields.Many2one('brodher.sn.move', string='Receipt Move', ondelete='set null')
+    shipped_move_id = fields.Many2one('brodher.sn.move', string='Shipment Move', ondelete='set null')
+    in_stock = fields.Boolean(string='In Stock', compute='_compute_in_stock', store=True, index=True)
+    
+    location_id = fields.Many2one('stock.location', string='Current Location', index=True)
+    last_picking_id = fields.Many2one('stock.picking', string='Last Picking')
+    last_move_date = fields.Datetime(string='Last Move Date')
+    
+    _sql_constraints = [
+        ('unique_serial_number',
+         'unique(serial_number_id)',
+         'A serial number can only have one stock state!'),
+    ]
+    
+    @api.depends('received_move_id', 'shipped_move_id')
+    def _compute_in_stock(self):
+        for state in self:
+            state.in_stock = bool(state.received_move_id) and not state.shipped_move_id
+    
+    @api.model
+    def _apply_moves(self, sn_moves):
+        """Fold the SN moves of done pickings into the state of their serial numbers"""
+        sn_moves = sn_moves.filtered(lambda m: m.picking_id.state == 'done')
+        if not sn_moves:
+            return
+        
+        lots = sn_moves.serial_number_id
+        state_by_lot = {state.serial_number_id.id: state for state in self.search([('serial_number_id', 'in', lots.ids)])}
+        missing_lots = lots.filtered(lambda lot: lot.id not in state_by_lot)
+        for state in self.create([{'serial_number_id': lot.id} for lot in missing_lots]):
+            state_by_lot[state.serial_number_id.id] = state
+        
+        vals_by_lot = {}
+        for move in sn_moves.sorted(lambda m: (m.move_date, m.id)):
+            state = state_by_lot[move.serial_number_id.id]
+            vals = vals_by_lot.setdefault(move.serial_number_id.id, {})
+            if state.last_move_date and move.move_date < state.last_move_date:
+                continue
+            vals.update({
+                'location_id': move.location_dest_id.id,
+                'last_picking_id': move.picking_id.id,
+                'last_move_date': move.move_date,
+            })
+            if move.move_type == 'in' and not state.received_move_id and 'received_move_id' not in vals:
+                vals['received_move_id'] = move.id
+            elif move.move_type == 'out':
+                vals['shipped_move_id'] = move.id
+        
+        for lot_id, vals in vals_by_lot.items():
+            if vals:
+                state_by_lot[lot_id].write(vals)
+    
+    @api.model
+    def _rebuild(self):
+        """Recompute the state of every serial number from the full move history"""
+        self.env.flush_all()
+        self.env.cr.execute("DELETE FROM brodher_sn_state")
+        self.env.cr.execute("""
+            WITH done_move AS (
+                SELECT m.id, m.serial_number_id, m.move_type, m.location_dest_id,
+                       m.picking_id, m.move_date
+                  FROM brodher_sn_move m
+                  JOIN stock_picking p ON p.id = m.picking_id
+                 WHERE p.state = 'done'
+            )
+            INSERT INTO brodher_sn_state
+                   (serial_number_id, product_id, received_move_id, shipped_move_id, in_stock,
+                    location_id, last_picking_id, last_move_date,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT lot.id, lot.product_id, rcv.id, shp.id, rcv.id IS NOT NULL AND shp.id IS NULL,
+                   last.location_dest_id, last.picking_id, last.move_date,
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM (SELECT DISTINCT serial_number_id FROM done_move) sn
+              JOIN stock_lot lot ON lot.id = sn.serial_number_id
+              JOIN LATERAL (
+                    SELECT dm.location_dest_id, dm.picking_id, dm.move_date
+                      FROM done_move dm
+                     WHERE dm.serial_number_id = lot.id
+                  ORDER BY dm.move_date DESC NULLS LAST, dm.id DESC
+                     LIMIT 1) last ON TRUE
+         LEFT JOIN LATERAL (
+                    SELECT dm.id
+                      FROM done_move dm
+                     WHERE dm.serial_number_id = lot.id AND dm.move_type = 'in'
+                  ORDER BY dm.move_date, dm.id
+                     LIMIT 1) rcv ON TRUE
+         LEFT JOIN LATERAL (
+                    SELECT dm.id
+                      FROM done_move dm
+                     WHERE dm.serial_number_id = lot.id AND dm.move_type = 'out'
+                  ORDER BY dm.move_date DESC NULLS LAST, dm.id DESC
+                     LIMIT 1) shp ON TRUE
+        """, {'uid': self.env.uid})
+        self.env.invalidate_all()
+        return True
@@ -1,14 +1,21 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
-from odoo.exceptions import ValidationError
+from odoo.exceptions import ValidationError, UserError
+from odoo.tools import escape_psql
+from odoo.tools.sql import create_index
 from datetime import datetime
-import qrcode
+from markupsafe import Markup
+from urllib.parse import quote
 import base64
-from io import BytesIO
 import logging
 
+from odoo.addons.brodher_qr_base.tools.qr_code import render_qr_png_batch, render_qr_svg
+
 _logger = logging.getLogger(__name__)
 
+# Larger label runs are rendered by a brodher.sn.job
+LABEL_INLINE_LIMIT = 2000
+
 class StockLot(models.Model):
     _inherit = 'stock.lot'
     
@@ -28,43 +35,167 @@ class StockLot(models.Model):
     qc_passed = fields.Boolean(string='QC Passed', default=True)
     sn_generated_date = fields.Datetime(string='Generated Date', readonly=True)
     
-    qr_code = fields.Binary(string='QR Code', compute='_compute_qr_code', store=True, attachment=True)
+    qr_code = fields.Binary(string='QR Code', compute='_compute_qr_code')
+    qr_code_url = fields.Char(string='QR Code URL', compute='_compute_qr_code_url')
     
     sn_move_ids = fields.One2many('brodher.sn.move', 'serial_number_id', string='Move History')
     last_sn_move_date = fields.Datetime(string='Last Move Date')
     
+    sn_state_ids = fields.One2many('brodher.sn.state', 'serial_number_id', string='Stock State')
+    sn_in_stock = fields.Boolean(string='In Stock', compute='_compute_sn_stock_state')
+    sn_location_id = fields.Many2one('stock.location', string='Current Location', compute='_compute_sn_stock_state')
+    
+    # Search-only field: ('sn_pickable_move_type', '=', move_type) filters the
+    # lots that may be scanned for that move type, evaluated in SQL
+    sn_pickable_move_type = fields.Selection([
+        ('in', 'Stock In'),
+        ('out', 'Stock Out'),
+        ('internal', 'Internal Transfer')
+    ], string='Pickable For', compute='_compute_sn_pickable_move_type', search='_search_sn_pickable_move_type')
+    
+    def init(self):
+        super().init()
+        # name ordered keyset pagination of the SN picker
+        create_index(self.env.cr, 'stock_lot_name_id_index', self._table, ['name', 'id'])
+        # partial and typo tolerant scans, see _lookup_serial_candidates
+        if self.env.registry.has_trigram:
+            create_index(self.env.cr, 'stock_lot_name_trgm_index', self._table,
+                         ['name gin_trgm_ops'], method='gin')
+    
     @api.depends('name')
     def _compute_qr_code(self):
+        names = [name for name in self.mapped('name') if name]
+        try:
+            # label jobs ask for a process pool through the context, see brodher.sn.job
+            pngs = dict(zip(names, render_qr_png_batch(names, max_workers=self.env.context.get('qr_render_workers'))))
+        except Exception as e:
+            _logger.error('QR Code error for %d serial numbers: %s' % (len(names), str(e)))
+            pngs = {}
         for record in self:
-            if record.name:
-                try:
-                    qr = qrcode.QRCode(
-                        version=1,
-                        error_correction=qrcode.constants.ERROR_CORRECT_L,
-                        box_size=10,
-                        border=4,
-                    )
-                    qr.add_data(record.name)
-                    qr.make(fit=True)
-                    img = qr.make_image(fill_color="black", back_color="white")
-                    buffer = BytesIO()
-                    img.save(buffer, format='PNG')
-                    record.qr_code = base64.b64encode(buffer.getvalue())
-                except Exception as e:
-                    _logger.error('QR Code error for %s: %s' % (record.name, str(e)))
-                    record.qr_code = False
-            else:
-                record.qr_code = False
+            png = pngs.get(record.name)
+            record.qr_code = base64.b64encode(png) if png else False
+    
+    @api.depends('name')
+    def _compute_qr_code_url(self):
+        for record in self:
+            record.qr_code_url = '/brodher/sn/qr/%s' % quote(record.name, safe='') if record.name else False
+    
+    @api.depends('sn_state_ids.in_stock', 'sn_state_ids.location_id')
+    def _compute_sn_stock_state(self):
+        for record in self:
+            state = record.sn_state_ids[:1]
+            record.sn_in_stock = state.in_stock
+            record.sn_location_id = state.location_id
+    
+    def _compute_sn_pickable_move_type(self):
+        self.sn_pickable_move_type = False
+    
+    def _search_sn_pickable_move_type(self, operator, value):
+        if operator != '=' or value not in ('in', 'out', 'internal'):
+            raise UserError(_('Unsupported search on %s: %s %s') % ('sn_pickable_move_type', operator, value))
+        return self._get_sn_available_domain(value)
+    
+    @api.model
+    def _get_sn_available_domain(self, move_type):
+        """Domain of the serial numbers that may be scanned for ``move_type``"""
+        if move_type == 'in':
+            # BARANG MASUK: Hanya SN yang BELUM PERNAH masuk gudang
+            return [('sn_state_ids', 'not any', [('received_move_id', '!=', False)])]
+        elif move_type == 'out':
+            # BARANG KELUAR: Hanya SN yang ADA DI GUDANG (sudah masuk, belum keluar)
+            return [
+                ('sn_state_ids', 'any', [('in_stock', '=', True)]),
+                ('sn_status', '=', 'available'),
+            ]
+        # TRANSFER INTERNAL: Yang ada di gudang sumber
+        return [
+            ('sn_state_ids', 'any', [('in_stock', '=', True)]),
+            ('sn_status', 'in', ['available', 'reserved']),
+        ]
+    
+    @api.model
+    def search_available_sn_page(self, picking_id, move_type, search=None, after_name=None, after_id=None, limit=80):
+        """Keyset-paginated list of the SNs that can be scanned in a picking.
+        
+        Pass the name and id of the last returned SN as ``after_name`` and
+        ``after_id`` to get the next page. Names repeat across products, so
+        the cursor is the ``(name, id)`` pair of the ordering; the cost of a
+        page does not depend on how many SNs exist.
+        """
+        picking = self.env['stock.picking'].browse(picking_id)
+        domain = picking._get_sn_lot_domain(move_type)
+        if search:
+            domain.append(('name', 'ilike', search))
+        if after_name and after_id:
+            domain += ['|', ('name', '>', after_name), '&', ('name', '=', after_name), ('id', '>', after_id)]
+        elif after_name:
+            domain.append(('name', '>', after_name))
+        lots = self.search_fetch(domain, ['name'], order='name, id', limit=limit)
+        return [{'id': lot.id, 'name': lot.name} for lot in lots]
+    
+    def _get_qr_code_svg(self):
+        """Inline vector QR code, used by the vector label reports"""
+        self.ensure_one()
+        return Markup(render_qr_svg(self.name)) if self.name else ''
+    
+    @api.model
+    def _lookup_serial_candidates(self, scanned, limit=5, products=None):
+        """Resolve a scanned text to SN lots.
+        
+        Returns the exact matches when there are some (several when products
+        share a serial name), otherwise candidates: the serials ending with
+        the text (worn leading characters on a label), then the closest names
+        by trigram similarity. Backed by the trigram index on ``name``.
+        Pass ``products`` to only look at the SNs of those products, e.g. the
+        products of a picking.
+        """
+        scanned = (scanned or '').strip()
+        if not scanned:
+            return self.browse()
+        domain = [('sn_type', '!=', False)]
+        if products is not None:
+            domain.append(('product_id', 'in', products.ids))
+        exact = self.search(domain + [('name', '=', scanned)], limit=limit)
+        if exact:
+            return exact
+        if len(scanned) >= 3:
+            suffix = self.search(domain + [('name', '=like', '%' + escape_psql(scanned))], limit=limit, order='name')
+            if suffix:
+                return suffix
+        if not self.env.registry.has_trigram:
+            return self.browse()
+        self.flush_model(['name', 'sn_type', 'product_id'])
+        self.env.cr.execute("""
+            SELECT id
+              FROM stock_lot
+             WHERE sn_type IS NOT NULL AND name %% %s
+               AND (%s OR product_id = ANY(%s))
+          ORDER BY name <-> %s, id
+             LIMIT %s
+        """, [scanned, products is None, products.ids if products is not None else [], scanned, limit])
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        # re-apply access rules, keep the similarity order
+        allowed = set(self.search([('id', 'in', ids)]).ids)
+        return self.browse([record_id for record_id in ids if record_id in allowed])
+    
+    @api.model
+    def _read_sn_status_counts(self, domain):
+        """``{product: {sn_status: count}}`` of the SN lots in ``domain``, one grouped query"""
+        counts = {}
+        for product, status, count in self._read_group(
+            domain + [('sn_type', '!=', False)], ['product_id', 'sn_status'], ['__count'],
+        ):
+            counts.setdefault(product, {})[status] = count
+        return counts
     
     @api.model
     def _get_next_sequence(self, sn_type, year_code, product_id):
-        last_sn = self.search([
-            ('sn_type', '=', sn_type),
-            ('year_code', '=', year_code),
-            ('name', 'like', f'PF{year_code}{sn_type}%'),
-            ('product_id', '=', product_id)
-        ], order='sequence_number desc', limit=1)
-        return (last_sn.sequence_number + 1) if last_sn and last_sn.sequence_number else 1
+        return self.env['brodher.sn.sequence']._peek('PF', sn_type, year_code, product_id)
+    
+    @api.model
+    def _reserve_sequence_range(self, sn_type, year_code, product_id, quantity):
+        """Reserve ``quantity`` contiguous sequence numbers, return the first one"""
+        return self.env['brodher.sn.sequence']._reserve('PF', sn_type, year_code, product_id, quantity)
     
     @api.model
     def generate_serial_numbers(self, product_tmpl_id, product_id, sn_type, quantity=1):
@@ -82,39 +213,49 @@ class StockLot(models.Model):
             raise ValidationError(_('Product variant not found!'))
         if product.tracking != 'serial':
             raise ValidationError(_('Product must have tracking by Serial Number!'))
+        if quantity <= 0:
+            return self.browse()
         
         current_year = datetime.now().strftime('%y')
-        serial_numbers = []
+        first_seq = self._reserve_sequence_range(sn_type, current_year, product.id, quantity)
+        sn_names = {
+            seq: f"PF{current_year}{sn_type}{seq:07d}"
+            for seq in range(first_seq, first_seq + quantity)
+        }
+        
+        # Names created outside the generator (manual lots) must not be duplicated
+        existing_names = set(self.search([
+            ('name', 'in', list(sn_names.values())),
+            ('product_id', '=', product.id),
+        ]).mapped('name'))
+        if existing_names:
+            _logger.warning('%d SN already exist! Skipping...' % len(existing_names))
         
-        for i in range(quantity):
-            next_seq = self._get_next_sequence(sn_type, current_year, product.id)
-            sn_name = f"PF{current_year}{sn_type}{next_seq:07d}"
-            
-            if self.search([('name', '=', sn_name), ('product_id', '=', product.id)], limit=1):
-                _logger.warning('SN %s exists! Skipping...' % sn_name)
-                continue
-            
-            try:
-                sn_record = self.create({
-                    'name': sn_name,
-                    'product_id': product.id,
-                    'company_id': self.env.company.id,
-                    'sn_type': sn_type,
-                    'year_code': current_year,
-                    'sequence_number': next_seq,
-                    'sn_status': 'available',
-                    'qc_passed': True,
-                    'sn_generated_date': fields.Datetime.now(),
-                })
-                serial_numbers.append(sn_record)
-                _logger.info('✓ Created: %s' % sn_name)
-            except Exception as e:
-                _logger.error('✗ Failed %s: %s' % (sn_name, str(e)))
-                continue
+        now = fields.Datetime.now()
+        vals_list = [{
+            'name': sn_name,
+            'product_id': product.id,
+            'company_id': self.env.company.id,
+            'sn_type': sn_type,
+            'year_code': current_year,
+            'sequence_number': seq,
+            'sn_status': 'available',
+            'qc_passed': True,
+            'sn_generated_date': now,
+        } for seq, sn_name in sn_names.items() if sn_name not in existing_names]
         
+        serial_numbers = self.create(vals_list)
+        _logger.info('✓ Created %d SN for %s' % (len(serial_numbers), product.display_name))
         return serial_numbers
     
     def action_print_qr_labels(self):
+        if len(self) > LABEL_INLINE_LIMIT:
+            job = self.env['brodher.sn.job']._enqueue(
+                'render_labels', _('QR labels for %d serial numbers') % len(self),
+                {'lot_ids': self.ids, 'report': 'brodher_product_serial.action_report_sn_qr_labels'},
+                total=len(self),
+            )
+            return job._action_notify_queued()
         return self.env.ref('brodher_product_serial.action_report_sn_qr_labels').report_action(self)
     
     def name_get(self):
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+
+
+class StockMove(models.Model):
+    _inherit = 'stock.move'
+    
+    is_sn_product = fields.Boolean(string='SN Product', compute='_compute_is_sn_product', store=True)
+    sn_scanned_qty = fields.Integer(string='Scanned SN', compute='_compute_sn_scanned_qty', store=True)
+    sn_scan_pending = fields.Boolean(string='SN Scan Pending', compute='_compute_sn_scan_pending', store=True, index=True)
+    
+    @api.depends('product_id.tracking', 'product_id.product_tmpl_id.sn_product_type')
+    def _compute_is_sn_product(self):
+        for move in self:
+            move.is_sn_product = bool(
+                move.product_id.tracking == 'serial' and move.product_id.product_tmpl_id.sn_product_type
+            )
+    
+    @api.depends('picking_id.sn_move_ids.product_tmpl_id', 'product_id')
+    def _compute_sn_scanned_qty(self):
+        """Scans of the move's product template in its picking, one query per batch"""
+        picking_ids = [picking_id for picking_id in self.picking_id._origin.ids if picking_id]
+        counts = {}
+        if picking_ids:
+            groups = self.env['brodher.sn.move']._read_group(
+                [('picking_id', 'in', picking_ids)],
+                ['picking_id', 'product_tmpl_id'],
+                ['__count'],
+            )
+            counts = {(picking.id, product_tmpl.id): count for picking, product_tmpl, count in groups}
+        for move in self:
+            move.sn_scanned_qty = counts.get(
+                (move.picking_id._origin.id, move.product_id.product_tmpl_id.id), 0
+            )
+    
+    @api.depends('is_sn_product', 'sn_scanned_qty', 'product_uom_qty', 'state')
+    def _compute_sn_scan_pending(self):
+        for move in self:
+            move.sn_scan_pending = (
+                move.is_sn_product
+                and move.state not in ('draft', 'done', 'cancel')
+                and move.sn_scanned_qty < int(move.product_uom_qty)
+            )
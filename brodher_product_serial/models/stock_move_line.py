@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+from odoo.tools.sql import create_index
+
+
+class StockMoveLine(models.Model):
+    _inherit = 'stock.move.line'
+    
+    def init(self):
+        super().init()
+        # free lines of a picking/product, see stock.picking._assign_sn_move_lines
+        create_index(
+            self.env.cr, 'stock_move_line_sn_unassigned_index', self._table,
+            ['picking_id', 'product_id', 'id'], where='lot_id IS NULL',
+        )
@@ -1,37 +1,58 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools.sql import create_index, drop_index
+from collections import deque
+from psycopg2.errors import UniqueViolation
+import logging
+
+from .sn_move import UNIQUE_DONE_RECEIPT_INDEX
+
+_logger = logging.getLogger(__name__)
 
 class StockPicking(models.Model):
     _inherit = 'stock.picking'
     
     sn_move_ids = fields.One2many('brodher.sn.move', 'picking_id', string='SN Moves')
-    scanned_sn_count = fields.Integer(string='Scanned SN', compute='_compute_scanned_sn_count')
-    require_sn_scan = fields.Boolean(string='Require SN', compute='_compute_require_sn_scan')
-    has_sn_products = fields.Boolean(string='Has SN Products', compute='_compute_has_sn_products')
+    scanned_sn_count = fields.Integer(string='Scanned SN', compute='_compute_scanned_sn_count', store=True)
+    require_sn_scan = fields.Boolean(string='Require SN', compute='_compute_has_sn_products', store=True)
+    has_sn_products = fields.Boolean(string='Has SN Products', compute='_compute_has_sn_products', store=True, index=True)
+    sn_scan_pending = fields.Boolean(string='SN Scan Pending', compute='_compute_sn_scan_pending', store=True)
+    
+    def init(self):
+        super().init()
+        # open pickings still waiting for scans, see stock.picking.type count_sn_scan_pending
+        # nama lama dipakai juga oleh brodher_product_Sn, tiap modul punya index sendiri
+        drop_index(self.env.cr, 'stock_picking_sn_scan_pending_index', self._table)
+        create_index(
+            self.env.cr, 'stock_picking_brodher_sn_scan_pending_index', self._table,
+            ['picking_type_id', 'id'], where='sn_scan_pending IS TRUE',
+        )
     
     @api.depends('sn_move_ids')
     def _compute_scanned_sn_count(self):
+        counts = {}
+        picking_ids = [picking_id for picking_id in self._origin.ids if picking_id]
+        if picking_ids:
+            counts = dict(self.env['brodher.sn.move']._read_group(
+                [('picking_id', 'in', picking_ids)], ['picking_id'], ['__count'],
+            ))
         for picking in self:
-            picking.scanned_sn_count = len(picking.sn_move_ids)
-    
-    @api.depends('move_ids_without_package')
-    def _compute_require_sn_scan(self):
-        for picking in self:
-            picking.require_sn_scan = any(
-                move.product_id.tracking == 'serial' and move.product_id.product_tmpl_id.sn_product_type
-                for move in picking.move_ids_without_package
-            )
+            picking.scanned_sn_count = counts.get(picking._origin, 0)
     
-    @api.depends('move_ids_without_package')
+    @api.depends('move_ids.is_sn_product')
     def _compute_has_sn_products(self):
         """Check if picking has products with SN tracking"""
         for picking in self:
-            picking.has_sn_products = any(
-                move.product_id.tracking == 'serial' and move.product_id.product_tmpl_id.sn_product_type
-                for move in picking.move_ids_without_package
+            picking.has_sn_products = picking.require_sn_scan = any(
+                picking.move_ids_without_package.mapped('is_sn_product')
             )
     
+    @api.depends('move_ids.sn_scan_pending')
+    def _compute_sn_scan_pending(self):
+        for picking in self:
+            picking.sn_scan_pending = any(picking.move_ids.mapped('sn_scan_pending'))
+    
     def action_scan_serial_number(self):
         self.ensure_one()
         
@@ -44,11 +65,7 @@ class StockPicking(models.Model):
                 '2. Serial Number Type: Man or Woman'
             ))
         
-        move_type = 'internal'
-        if self.picking_type_code == 'incoming':
-            move_type = 'in'
-        elif self.picking_type_code == 'outgoing':
-            move_type = 'out'
+        move_type = self._get_sn_move_type()
         
         return {
             'name': _('Scan Serial Number - %s') % self.name,
@@ -64,6 +81,27 @@ class StockPicking(models.Model):
             }
         }
     
+    def _get_sn_move_type(self):
+        self.ensure_one()
+        if self.picking_type_code == 'incoming':
+            return 'in'
+        elif self.picking_type_code == 'outgoing':
+            return 'out'
+        return 'internal'
+    
+    def _get_sn_products(self):
+        return self.move_ids_without_package.filtered('is_sn_product').mapped('product_id')
+    
+    def _get_sn_lot_domain(self, move_type):
+        """Domain of the serial numbers that can still be scanned in this picking"""
+        self.ensure_one()
+        return [
+            ('product_id', 'in', self._get_sn_products().ids),
+            ('sn_type', '!=', False),
+            ('sn_pickable_move_type', '=', move_type),
+            ('sn_move_ids', 'not any', [('picking_id', '=', self.id)]),
+        ]
+    
     def action_view_sn_moves(self):
         self.ensure_one()
         return {
@@ -74,30 +112,382 @@ class StockPicking(models.Model):
             'domain': [('picking_id', '=', self.id)],
         }
     
-    def _check_sn_scan_completion(self):
+    def _check_sn_scans(self, lots, move_type):
+        """Validate scanned serial numbers for this picking.
+        
+        All lots are checked with a fixed number of queries, whatever the
+        size of ``lots``. Returns ``{lot_id: (error_code, message)}`` for the
+        rejected ones.
+        """
         self.ensure_one()
-        if not self.require_sn_scan:
-            return True, None
+        errors = {}
+        states = {state.serial_number_id.id: state for state in lots.sn_state_ids}
+        picking_products = self.move_ids_without_package.product_id
+        already_scanned = {
+            sn_move.serial_number_id.id: sn_move
+            for sn_move in self.env['brodher.sn.move'].search([
+                ('picking_id', '=', self.id),
+                ('serial_number_id', 'in', lots.ids),
+            ])
+        }
         
-        for move in self.move_ids_without_package:
-            product_tmpl = move.product_id.product_tmpl_id
+        for sn in lots:
+            state = states.get(sn.id, self.env['brodher.sn.state'])
             
-            # Skip products without SN tracking
-            if move.product_id.tracking != 'serial' or not product_tmpl.sn_product_type:
+            if move_type == 'in':
+                # INCOMING: Cek jangan sampai double receive
+                existing_in = state.received_move_id
+                if existing_in:
+                    errors[sn.id] = ('already_received', _(
+                        '❌ SERIAL NUMBER SUDAH MASUK GUDANG!\n\n'
+                        '🔹 Serial Number: %s\n'
+                        '🔹 Received in: %s\n'
+                        '🔹 Date: %s\n'
+                        '🔹 User: %s\n\n'
+                        '⚠️ Serial number ini TIDAK BISA diterima lagi!'
+                    ) % (
+                        sn.name,
+                        existing_in.picking_id.name,
+                        existing_in.move_date.strftime('%Y-%m-%d %H:%M:%S'),
+                        existing_in.user_id.name
+                    ))
+                    continue
+            
+            elif move_type == 'out':
+                # OUTGOING: Harus sudah masuk gudang dan belum keluar
+                if not state.received_move_id:
+                    errors[sn.id] = ('not_received', _(
+                        '❌ SERIAL NUMBER BELUM MASUK GUDANG!\n\n'
+                        '🔹 Serial Number: %s\n\n'
+                        '⚠️ SN ini belum pernah diterima di gudang.\n'
+                        'Hanya SN yang sudah ada di stock yang bisa dikirim!'
+                    ) % sn.name)
+                    continue
+                
+                shipped = state.shipped_move_id
+                if shipped:
+                    errors[sn.id] = ('already_shipped', _(
+                        '❌ SERIAL NUMBER SUDAH KELUAR GUDANG!\n\n'
+                        '🔹 Serial Number: %s\n'
+                        '🔹 Shipped in: %s\n'
+                        '🔹 Date: %s\n'
+                        '🔹 User: %s\n\n'
+                        '⚠️ SN ini sudah tidak ada di gudang!'
+                    ) % (
+                        sn.name,
+                        shipped.picking_id.name,
+                        shipped.move_date.strftime('%Y-%m-%d %H:%M:%S'),
+                        shipped.user_id.name
+                    ))
+                    continue
+                
+                # Status harus available
+                if sn.sn_status != 'available':
+                    errors[sn.id] = ('invalid_status', _(
+                        '❌ STATUS SERIAL NUMBER TIDAK VALID!\n\n'
+                        '🔹 Serial Number: %s\n'
+                        '🔹 Current Status: %s\n'
+                        '🔹 Required Status: AVAILABLE\n\n'
+                        '⚠️ Hanya SN dengan status Available yang bisa dikirim!'
+                    ) % (sn.name, (sn.sn_status or '').upper()))
+                    continue
+            
+            # Validation: Product in picking
+            if sn.product_id not in picking_products:
+                errors[sn.id] = ('product_not_in_picking', _(
+                    '❌ PRODUCT TIDAK ADA DI PICKING INI!\n\n'
+                    '🔹 Serial Number: %s\n'
+                    '🔹 Product: %s\n\n'
+                    '⚠️ Product ini tidak ada dalam picking.'
+                ) % (sn.name, sn.product_id.name))
                 continue
             
-            scanned_count = len(self.sn_move_ids.filtered(
-                lambda sm: sm.serial_number_id.product_id.product_tmpl_id == product_tmpl
-            ))
+            # Validation: Already scanned in THIS picking
+            existing_in_this_picking = already_scanned.get(sn.id)
+            if existing_in_this_picking:
+                errors[sn.id] = ('already_scanned', _(
+                    '❌ SUDAH DI-SCAN DI PICKING INI!\n\n'
+                    '🔹 Serial Number: %s\n'
+                    '🔹 Scanned by: %s\n'
+                    '🔹 Date: %s'
+                ) % (sn.name, existing_in_this_picking.user_id.name, existing_in_this_picking.move_date))
+        
+        return errors
+    
+    def _register_sn_scans(self, lots, move_type, location_src_id=False, location_dest_id=False, notes=False):
+        """Record validated scans: SN moves, SN status and move line lots"""
+        self.ensure_one()
+        if not lots:
+            return self.env['brodher.sn.move']
+        sn_moves = self.env['brodher.sn.move'].create([{
+            'serial_number_id': sn.id,
+            'move_type': move_type,
+            'location_src_id': location_src_id,
+            'location_dest_id': location_dest_id or self.location_dest_id.id,
+            'picking_id': self.id,
+            'notes': notes,
+        } for sn in lots])
+        
+        # Update SN status
+        update_vals = {'last_sn_move_date': fields.Datetime.now()}
+        if move_type == 'in':
+            update_vals['sn_status'] = 'available'
+        elif move_type == 'out':
+            update_vals['sn_status'] = 'used'
+        elif move_type == 'internal':
+            update_vals['sn_status'] = 'reserved'
+        lots.write(update_vals)
+        
+        # Auto assign to move lines
+        self._assign_sn_move_lines(lots)
+        
+        return sn_moves
+    
+    def _process_sn_bulk_scan(self, names, move_type, location_src_id=False, location_dest_id=False, notes=False):
+        """Resolve, validate and register a list of unique serial names.
+        
+        Returns the registered lots and a list of ``(name, reason)`` failures.
+        """
+        self.ensure_one()
+        # SN names are only unique per product, resolve them among the products of the picking
+        lots = self.env['stock.lot'].search([
+            ('name', 'in', names),
+            ('product_id', 'in', self._get_sn_products().ids),
+            ('sn_type', '!=', False),
+        ])
+        lots_by_name = {}
+        for lot in lots:
+            lots_by_name.setdefault(lot.name, []).append(lot)
+        unmatched = [name for name in names if name not in lots_by_name]
+        elsewhere = set(self.env['stock.lot'].search([
+            ('name', 'in', unmatched), ('sn_type', '!=', False),
+        ]).mapped('name')) if unmatched else set()
+        
+        failures = []
+        lot_ids = []
+        for name in names:
+            matches = lots_by_name.get(name, [])
+            if len(matches) == 1:
+                lot_ids.append(matches[0].id)
+            elif matches:
+                failures.append((name, _('Matches %d serial numbers of different products') % len(matches)))
+            elif name in elsewhere:
+                failures.append((name, _('Product is not in this picking')))
+            else:
+                failures.append((name, _('Not found in the system')))
+        ordered_lots = self.env['stock.lot'].browse(lot_ids)
+        
+        errors = self._check_sn_scans(ordered_lots, move_type)
+        for lot in ordered_lots:
+            if lot.id in errors:
+                # First line of the message is the short reason
+                failures.append((lot.name, errors[lot.id][1].split('\n')[0].strip('❌ ')))
+        valid_lots = ordered_lots.filtered(lambda lot: lot.id not in errors)
+        
+        self._register_sn_scans(
+            valid_lots, move_type,
+            location_src_id=location_src_id,
+            location_dest_id=location_dest_id,
+            notes=notes,
+        )
+        _logger.info('✓ Bulk scan on %s: %d registered, %d failed' % (self.name, len(valid_lots), len(failures)))
+        return valid_lots, failures
+    
+    def _assign_sn_move_lines(self, lots):
+        """Put scanned lots on the free move lines of their product.
+        
+        Free lines are fetched with one indexed search per scanned product
+        (see stock.move.line init), limited to the number of lots of that
+        product, so the cost follows the number of scanned lots and not the
+        size of the picking.
+        """
+        self.ensure_one()
+        lot_counts = {}
+        for sn in lots:
+            lot_counts[sn.product_id.id] = lot_counts.get(sn.product_id.id, 0) + 1
+        queues = {}
+        for product_id, count in lot_counts.items():
+            queues[product_id] = deque(self.env['stock.move.line'].search([
+                ('picking_id', '=', self.id),
+                ('product_id', '=', product_id),
+                ('lot_id', '=', False),
+                '|', ('package_level_id', '=', False), ('picking_type_entire_packs', '=', False),
+            ], order='id', limit=count))
+        
+        assigned_ids = []
+        for sn in lots:
+            queue = queues.get(sn.product_id.id)
+            if not queue:
+                continue
+            move_line = queue.popleft()
+            move_line.write({
+                'lot_id': sn.id,
+                'lot_name': sn.name,
+                'quantity': 1,
+            })
+            assigned_ids.append(move_line.id)
+        if assigned_ids:
+            _logger.info('✓ Auto assigned %d SN to move lines of %s' % (len(assigned_ids), self.name))
+        return self.env['stock.move.line'].browse(assigned_ids)
+    
+    def _scan_sn_json(self, sn_name, move_type=False, notes=False, with_progress=False):
+        """Validate and register one scan, return a small JSON-able result.
+        
+        The full progress table (see _get_sn_scan_progress) is only added
+        with ``with_progress``, handheld scanners do not need it.
+        """
+        self.ensure_one()
+        if self.state in ('done', 'cancel'):
+            return {
+                'status': 'error',
+                'code': 'picking_closed',
+                'message': _('Picking %s is already %s!') % (self.name, self.state),
+                'serial_number': sn_name,
+            }
+        move_type = move_type or self._get_sn_move_type()
+        move_types = self.env['brodher.sn.move']._fields['move_type'].get_values(self.env)
+        if move_type not in move_types:
+            return {
+                'status': 'error',
+                'code': 'invalid_move_type',
+                'message': _('Invalid move type %s, expected one of: %s') % (move_type, ', '.join(move_types)),
+                'serial_number': sn_name,
+            }
+        
+        products = self._get_sn_products()
+        candidates = self.env['stock.lot']._lookup_serial_candidates(sn_name, products=products)
+        exact = candidates.filtered(lambda lot: lot.name == sn_name)
+        if len(exact) > 1:
+            return {
+                'status': 'error',
+                'code': 'ambiguous',
+                'message': _('Serial Number %s matches several products: %s') % (
+                    sn_name, ', '.join(exact.product_id.mapped('display_name'))),
+                'serial_number': sn_name,
+            }
+        sn = exact
+        if not sn:
+            if self.env['stock.lot'].search_count([('name', '=', sn_name), ('sn_type', '!=', False)], limit=1):
+                return {
+                    'status': 'error',
+                    'code': 'product_not_in_picking',
+                    'message': _('Serial Number %s does not belong to a product of %s!') % (sn_name, self.name),
+                    'serial_number': sn_name,
+                }
+            return {
+                'status': 'error',
+                'code': 'not_found',
+                'message': _('Serial Number %s not found in the system!') % (sn_name or ''),
+                'serial_number': sn_name,
+                'candidates': candidates.mapped('name'),
+            }
+        
+        errors = self._check_sn_scans(sn, move_type)
+        if errors:
+            error_code, error_msg = errors[sn.id]
+            return {
+                'status': 'error',
+                'code': error_code,
+                'message': error_msg,
+                'serial_number': sn.name,
+                'product': sn.product_id.display_name,
+            }
+        
+        self._register_sn_scans(
+            sn, move_type,
+            location_src_id=self.location_id.id,
+            location_dest_id=self.location_dest_id.id,
+            notes=notes,
+        )
+        moves = self.move_ids_without_package.filtered(
+            lambda m: m.product_id.product_tmpl_id == sn.product_id.product_tmpl_id
+        )
+        expected = sum(int(move.product_uom_qty) for move in moves)
+        scanned = moves[:1].sn_scanned_qty
+        result = {
+            'status': 'ok',
+            'code': False,
+            'serial_number': sn.name,
+            'product': sn.product_id.display_name,
+            'remaining': max(expected - scanned, 0),
+        }
+        if with_progress:
+            result['progress'] = self._get_sn_scan_progress()
+        return result
+    
+    def _get_sn_scan_progress(self, recent_limit=10):
+        """Expected vs scanned rows and the latest scans, as plain JSON data.
+        
+        Used by the scan wizard widget, and by the JSON scan endpoint when
+        asked for.
+        """
+        self.ensure_one()
+        rows = []
+        for move in self.move_ids_without_package.filtered('is_sn_product'):
+            expected = int(move.product_uom_qty)
+            scanned = move.sn_scanned_qty
+            if scanned >= expected:
+                status = 'done'
+            elif scanned > 0:
+                status = 'partial'
+            else:
+                status = 'pending'
+            rows.append({
+                'id': move.id,
+                'product': move.product_id.product_tmpl_id.name,
+                'expected': expected,
+                'scanned': scanned,
+                'remaining': expected - scanned,
+                'status': status,
+            })
+        
+        recent = [{
+            'id': sn_move.id,
+            'name': sn_move.serial_number_name,
+            'product': sn_move.product_tmpl_id.name,
+            'date': fields.Datetime.to_string(sn_move.move_date),
+            'user': sn_move.user_id.name,
+        } for sn_move in self.env['brodher.sn.move'].search(
+            [('picking_id', '=', self.id)], order='move_date desc, id desc', limit=recent_limit,
+        )]
+        
+        return {
+            'total_scanned': self.scanned_sn_count,
+            'rows': rows,
+            'recent': recent,
+        }
+    
+    def _check_sn_scan_completion(self):
+        self.ensure_one()
+        if not self.require_sn_scan:
+            return True, None
+        
+        for move in self.move_ids_without_package.filtered('is_sn_product'):
             required_qty = int(move.product_uom_qty)
-            
-            if scanned_count < required_qty:
+            if move.sn_scanned_qty < required_qty:
                 return False, _(
                     'Product "%s" requires %d serial numbers, but only %d scanned!'
-                ) % (product_tmpl.name, required_qty, scanned_count)
+                ) % (move.product_id.product_tmpl_id.name, required_qty, move.sn_scanned_qty)
         
         return True, None
     
+    def _action_done(self):
+        # super() may already flush picking_state, so it runs inside the
+        # savepoint too; flush=False so nothing is flushed before SAVEPOINT
+        try:
+            with self.env.cr.savepoint(flush=False):
+                res = super(StockPicking, self)._action_done()
+                self.env['brodher.sn.move'].flush_model(['picking_state'])
+        except UniqueViolation as e:
+            if e.diag.constraint_name != UNIQUE_DONE_RECEIPT_INDEX:
+                raise
+            raise ValidationError(_(
+                'A serial number in %s has already been received in another done receipt!'
+            ) % ', '.join(self.mapped('name')))
+        done_pickings = self.filtered(lambda p: p.state == 'done')
+        self.env['brodher.sn.state']._apply_moves(done_pickings.sn_move_ids)
+        return res
+    
     def button_validate(self):
         for picking in self:
             if picking.require_sn_scan:
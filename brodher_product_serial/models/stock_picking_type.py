@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, _
+
+
+class StockPickingType(models.Model):
+    _inherit = 'stock.picking.type'
+    
+    count_sn_scan_pending = fields.Integer(string='Pending SN Scan', compute='_compute_count_sn_scan_pending')
+    
+    def _compute_count_sn_scan_pending(self):
+        """One grouped count over the partial index on stock_picking.sn_scan_pending"""
+        counts = {}
+        type_ids = [type_id for type_id in self._origin.ids if type_id]
+        if type_ids:
+            self.env['stock.picking'].flush_model(['picking_type_id', 'sn_scan_pending'])
+            self.env.cr.execute("""
+                SELECT picking_type_id, COUNT(*)
+                  FROM stock_picking
+                 WHERE sn_scan_pending IS TRUE
+                   AND picking_type_id IN %s
+              GROUP BY picking_type_id
+            """, [tuple(type_ids)])
+            counts = dict(self.env.cr.fetchall())
+        for picking_type in self:
+            picking_type.count_sn_scan_pending = counts.get(picking_type._origin.id, 0)
+    
+    def action_view_sn_scan_pending(self):
+        self.ensure_one()
+        action = self.env['ir.actions.act_window']._for_xml_id('stock.action_picking_tree_all')
+        action.update({
+            'name': _('Pending SN Scan - %s') % self.display_name,
+            'domain': [('picking_type_id', '=', self.id)],
+            'context': {
+                'default_picking_type_id': self.id,
+                'search_default_sn_scan_pending': 1,
+            },
+        })
+        return action
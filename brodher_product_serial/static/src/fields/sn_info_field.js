@@ -0,0 +1,29 @@
+/** @odoo-module **/
+
+import { Component } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { deserializeDateTime, formatDateTime } from "@web/core/l10n/dates";
+import { standardFieldProps } from "@web/views/fields/standard_field_props";
+
+/**
+ * Details of the serial number being scanned in the scan wizard.
+ */
+export class SnInfoField extends Component {
+    static template = "brodher_product_serial.SnInfoField";
+    static props = { ...standardFieldProps };
+
+    get info() {
+        return this.props.record.data[this.props.name] || { state: "idle" };
+    }
+
+    formatDate(value) {
+        return value ? formatDateTime(deserializeDateTime(value), { format: "yyyy-MM-dd HH:mm" }) : "";
+    }
+}
+
+export const snInfoField = {
+    component: SnInfoField,
+    supportedTypes: ["json"],
+};
+
+registry.category("fields").add("brodher_sn_info", snInfoField);
@@ -0,0 +1,87 @@
+/** @odoo-module **/
+
+import { useEffect } from "@odoo/owl";
+import { _t } from "@web/core/l10n/translation";
+import { rpc } from "@web/core/network/rpc";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { CharField, charField } from "@web/views/fields/char/char_field";
+
+/**
+ * Scan input of the scan wizard.
+ *
+ * Enter registers the scan through /brodher/sn/scan and patches the
+ * progress field of the open wizard, instead of confirming and reopening
+ * the whole dialog for every scan.
+ */
+export class SnScanInputField extends CharField {
+    setup() {
+        super.setup();
+        this.notification = useService("notification");
+        useEffect(
+            (el) => {
+                if (!el) {
+                    return;
+                }
+                const onKeydown = (ev) => {
+                    if (ev.key === "Enter") {
+                        ev.preventDefault();
+                        ev.stopPropagation();
+                        this.scan(el.value.trim());
+                    }
+                };
+                el.addEventListener("keydown", onKeydown);
+                return () => el.removeEventListener("keydown", onKeydown);
+            },
+            () => [this.input.el]
+        );
+    }
+
+    async scan(serialNumber) {
+        if (!serialNumber || this.scanning) {
+            return;
+        }
+        const data = this.props.record.data;
+        const picking = data.picking_id;
+        this.scanning = true;
+        try {
+            const result = await rpc("/brodher/sn/scan", {
+                picking_id: Array.isArray(picking) ? picking[0] : picking.id,
+                serial_number: serialNumber,
+                move_type: data.move_type,
+                notes: data.notes || false,
+                with_progress: true,
+            });
+            if (result.status === "ok") {
+                this.notification.add(
+                    _t("%(serial)s scanned, %(remaining)s remaining", {
+                        serial: result.serial_number,
+                        remaining: result.remaining,
+                    }),
+                    { type: "success" }
+                );
+                await this.props.record.update({
+                    [this.props.name]: false,
+                    scan_progress: result.progress,
+                    total_scanned: result.progress.total_scanned,
+                });
+            } else {
+                let message = result.message;
+                if (result.candidates && result.candidates.length) {
+                    message += "\n" + _t("Did you mean: %s", result.candidates.join(", "));
+                }
+                this.notification.add(message, { type: "danger", sticky: true });
+            }
+        } finally {
+            this.scanning = false;
+            this.input.el?.select();
+        }
+    }
+}
+
+export const snScanInputField = {
+    ...charField,
+    component: SnScanInputField,
+};
+
+registry.category("fields").add("brodher_sn_scan_input", snScanInputField);
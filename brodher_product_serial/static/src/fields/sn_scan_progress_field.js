@@ -0,0 +1,42 @@
+/** @odoo-module **/
+
+import { Component } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { deserializeDateTime, formatDateTime } from "@web/core/l10n/dates";
+import { standardFieldProps } from "@web/views/fields/standard_field_props";
+
+const STATUS_LABELS = {
+    done: "✓ Complete",
+    partial: "◐ Partial",
+    pending: "○ Pending",
+};
+
+/**
+ * Expected vs scanned table of the scan wizard.
+ *
+ * The server only sends rows of plain values, rows are keyed by move id so
+ * a new scan only patches the row that changed.
+ */
+export class SnScanProgressField extends Component {
+    static template = "brodher_product_serial.SnScanProgressField";
+    static props = { ...standardFieldProps };
+
+    get progress() {
+        return this.props.record.data[this.props.name] || { rows: [], recent: [] };
+    }
+
+    statusLabel(status) {
+        return STATUS_LABELS[status] || status;
+    }
+
+    formatTime(value) {
+        return value ? formatDateTime(deserializeDateTime(value), { format: "HH:mm:ss" }) : "";
+    }
+}
+
+export const snScanProgressField = {
+    component: SnScanProgressField,
+    supportedTypes: ["json"],
+};
+
+registry.category("fields").add("brodher_sn_scan_progress", snScanProgressField);
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+from . import test_sn_zpl_labels
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import re
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestSNZplLabels(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.product = cls.env['product.product'].create({
+            'name': 'Parfum ^Noir~ 50ml',
+            'is_storable': True,
+            'tracking': 'serial',
+        })
+        cls.lots = cls.env['stock.lot'].create([{
+            'name': 'PF25W%07d' % seq,
+            'product_id': cls.product.id,
+            'sn_type': 'W',
+            'year_code': '25',
+            'sequence_number': seq,
+        } for seq in (1, 2, 3)])
+
+    def _render(self, lots):
+        content, report_type = self.env['ir.actions.report']._render_qweb_text(
+            'brodher_product_serial.action_report_sn_zpl_labels', lots.ids,
+        )
+        self.assertEqual(report_type, 'text')
+        return content.decode()
+
+    def test_one_label_per_lot(self):
+        zpl = self._render(self.lots)
+        labels = re.findall(r'\^XA.*?\^XZ', zpl, re.DOTALL)
+        self.assertEqual(len(labels), 3)
+        self.assertEqual(zpl.count('^XA'), 3)
+        self.assertEqual(zpl.count('^XZ'), 3)
+        for label, lot in zip(labels, self.lots):
+            self.assertTrue(label.startswith('^XA^CI28^PW400^LL240'))
+            self.assertIn('^FO10,10^BQN,2,5^FDMA,%s^FS' % lot.name, label)
+            self.assertIn('^FO170,30^A0N,28,22^FD%s^FS' % lot.name, label)
+            self.assertIn('^FO170,170^A0N,20,16^FDWoman 25^FS', label)
+
+    def test_product_name_is_escaped(self):
+        zpl = self._render(self.lots[:1])
+        # ^ and ~ would start ZPL commands inside the field data
+        self.assertIn('^FB220,4,0,L^FDParfum  Noir  50ml^FS', zpl)
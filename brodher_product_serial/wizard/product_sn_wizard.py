@@ -6,6 +6,9 @@ import logging
 
 _logger = logging.getLogger(__name__)
 
+# Larger quantities are generated by a brodher.sn.job
+GENERATE_INLINE_LIMIT = 10000
+
 class ProductSNWizard(models.TransientModel):
     _name = 'brodher.product.sn.wizard'
     _description = 'Product Serial Number Generation Wizard'
@@ -46,8 +49,22 @@ class ProductSNWizard(models.TransientModel):
         for wizard in self:
             if wizard.quantity <= 0:
                 raise UserError(_('Quantity must be greater than 0!'))
-            if wizard.quantity > 1000:
-                raise UserError(_('Cannot generate more than 1000 serial numbers at once!'))
+            if wizard.quantity > 1000000:
+                raise UserError(_('Cannot generate more than 1000000 serial numbers at once!'))
+            
+            if wizard.quantity > GENERATE_INLINE_LIMIT:
+                product = wizard.product_id or wizard.product_tmpl_id.product_variant_ids[:1]
+                job = self.env['brodher.sn.job']._enqueue(
+                    'generate_sn',
+                    _('Generate %d serial numbers for %s') % (wizard.quantity, product.display_name),
+                    {
+                        'product_tmpl_id': wizard.product_tmpl_id.id,
+                        'product_id': wizard.product_id.id if wizard.product_id else False,
+                        'sn_type': wizard.sn_type,
+                    },
+                    total=wizard.quantity,
+                )
+                return job._action_notify_queued()
             
             try:
                 StockLot = self.env['stock.lot']
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+import base64
 import logging
+import re
 
 _logger = logging.getLogger(__name__)
 
+# Larger bulk lists are processed by a brodher.sn.job
+BULK_SCAN_INLINE_LIMIT = 2000
+
 class ScanSNWizard(models.TransientModel):
     _name = 'brodher.scan.sn.wizard'
     _description = 'Scan Serial Number Wizard'
@@ -15,12 +20,22 @@ class ScanSNWizard(models.TransientModel):
     
     input_method = fields.Selection([
         ('scan', 'Scan QR Code'),
-        ('manual', 'Select Manually')
+        ('manual', 'Select Manually'),
+        ('bulk', 'Bulk List')
     ], string='Input Method', default='scan', required=True)
     
     scanned_sn = fields.Char(string='Scan Serial Number')
-    serial_number_id = fields.Many2one('stock.lot', string='Select Serial Number', domain="[('id', 'in', available_sn_ids)]")
-    available_sn_ids = fields.Many2many('stock.lot', compute='_compute_available_sn_ids', string='Available SNs')
+    bulk_sn_text = fields.Text(string='Serial Numbers', help='One serial number per line (commas and semicolons also work)')
+    bulk_sn_file = fields.Binary(string='Upload List', help='Text or CSV file, serial number in the first column')
+    bulk_sn_filename = fields.Char(string='File Name')
+    # Evaluated in SQL by name_search, see stock.picking._get_sn_lot_domain
+    serial_number_id = fields.Many2one(
+        'stock.lot', string='Select Serial Number',
+        domain="[('product_id', 'in', sn_product_ids), ('sn_type', '!=', False), "
+               "('sn_pickable_move_type', '=', move_type), "
+               "('sn_move_ids', 'not any', [('picking_id', '=', picking_id)])]"
+    )
+    sn_product_ids = fields.Many2many('product.product', compute='_compute_sn_product_ids', string='SN Products')
     
     move_type = fields.Selection([
         ('in', 'Stock In'),
@@ -32,416 +47,128 @@ class ScanSNWizard(models.TransientModel):
     location_dest_id = fields.Many2one('stock.location', string='To', required=True)
     notes = fields.Text(string='Notes')
     
-    sn_info = fields.Html(string='Serial Number Info', compute='_compute_sn_info')
+    sn_info = fields.Json(string='Serial Number Info', compute='_compute_sn_info')
     total_scanned = fields.Integer(string='Total Scanned', compute='_compute_total_scanned')
-    scanned_list = fields.Html(string='Scanned List', compute='_compute_scanned_list')
-    expected_quantities = fields.Html(string='Expected Quantities', compute='_compute_expected_quantities')
+    scan_progress = fields.Json(string='Scan Progress', compute='_compute_scan_progress')
     
-    @api.depends('picking_id', 'move_type')
-    def _compute_available_sn_ids(self):
-        """Get available serial numbers dengan logika yang benar"""
-        for wizard in self:
-            if not wizard.picking_id:
-                wizard.available_sn_ids = [(5, 0, 0)]
-                continue
-            
-            # Get products with SN tracking
-            products = wizard.picking_id.move_ids_without_package.filtered(
-                lambda m: m.product_id.tracking == 'serial' and m.product_id.product_tmpl_id.sn_product_type
-            ).mapped('product_id')
-            
-            if not products:
-                wizard.available_sn_ids = [(5, 0, 0)]
-                continue
-            
-            # Build domain
-            domain = [
-                ('product_id', 'in', products.ids),
-                ('sn_type', '!=', False)
-            ]
-            
-            # LOGIKA BERBEDA PER MOVE TYPE
-            if wizard.move_type == 'in':
-                # ====================================
-                # BARANG MASUK: Hanya SN yang BELUM PERNAH masuk gudang
-                # ====================================
-                
-                # Get all SN IDs that sudah pernah masuk (status done)
-                already_received_sn_ids = self.env['brodher.sn.move'].search([
-                    ('move_type', '=', 'in'),
-                    ('picking_id.state', '=', 'done')
-                ]).mapped('serial_number_id.id')
-                
-                # EXCLUDE SN yang sudah pernah received
-                if already_received_sn_ids:
-                    domain.append(('id', 'not in', already_received_sn_ids))
-                
-                # Hanya yang belum pernah dipakai atau baru generate
-                # (tidak peduli status, yang penting belum pernah masuk)
-                
-            elif wizard.move_type == 'out':
-                # ====================================
-                # BARANG KELUAR: Hanya SN yang ADA DI GUDANG (sudah masuk, belum keluar)
-                # ====================================
-                
-                # Get SN yang SUDAH masuk gudang (status done)
-                received_sn_ids = self.env['brodher.sn.move'].search([
-                    ('move_type', '=', 'in'),
-                    ('picking_id.state', '=', 'done')
-                ]).mapped('serial_number_id.id')
-                
-                # Get SN yang SUDAH keluar gudang (status done)
-                shipped_sn_ids = self.env['brodher.sn.move'].search([
-                    ('move_type', '=', 'out'),
-                    ('picking_id.state', '=', 'done')
-                ]).mapped('serial_number_id.id')
-                
-                # SN di gudang = sudah masuk TAPI belum keluar
-                available_in_warehouse = list(set(received_sn_ids) - set(shipped_sn_ids))
-                
-                if available_in_warehouse:
-                    domain.append(('id', 'in', available_in_warehouse))
-                else:
-                    # Tidak ada stock di gudang
-                    domain.append(('id', '=', False))
-                
-                # Status harus available
-                domain.append(('sn_status', '=', 'available'))
-                
-            elif wizard.move_type == 'internal':
-                # ====================================
-                # TRANSFER INTERNAL: Yang ada di gudang sumber
-                # ====================================
-                
-                # Similar logic dengan outgoing
-                received_sn_ids = self.env['brodher.sn.move'].search([
-                    ('move_type', '=', 'in'),
-                    ('picking_id.state', '=', 'done')
-                ]).mapped('serial_number_id.id')
-                
-                shipped_sn_ids = self.env['brodher.sn.move'].search([
-                    ('move_type', '=', 'out'),
-                    ('picking_id.state', '=', 'done')
-                ]).mapped('serial_number_id.id')
-                
-                available_in_warehouse = list(set(received_sn_ids) - set(shipped_sn_ids))
-                
-                if available_in_warehouse:
-                    domain.append(('id', 'in', available_in_warehouse))
-                else:
-                    domain.append(('id', '=', False))
-                
-                domain.append(('sn_status', 'in', ['available', 'reserved']))
-            
-            # EXCLUDE yang sudah di-scan di picking ini (belum done)
-            already_scanned_this_picking = wizard.picking_id.sn_move_ids.mapped('serial_number_id.id')
-            if already_scanned_this_picking:
-                domain.append(('id', 'not in', already_scanned_this_picking))
-            
-            available_sns = self.env['stock.lot'].search(domain, order='name')
-            wizard.available_sn_ids = [(6, 0, available_sns.ids)]
     @api.depends('picking_id')
-    def _compute_total_scanned(self):
+    def _compute_sn_product_ids(self):
         for wizard in self:
-            wizard.total_scanned = len(wizard.picking_id.sn_move_ids) if wizard.picking_id else 0
+            wizard.sn_product_ids = wizard.picking_id._get_sn_products()
     
     @api.depends('picking_id')
-    def _compute_expected_quantities(self):
-        """Show expected vs scanned quantities - only for SN tracked products"""
+    def _compute_total_scanned(self):
         for wizard in self:
-            if wizard.picking_id:
-                html = '<div style="margin: 10px 0;"><strong>Products to Scan:</strong>'
-                html += '<table class="table table-sm table-bordered" style="margin-top: 5px;">'
-                html += '<thead><tr><th>Product</th><th>Expected</th><th>Scanned</th><th>Remaining</th><th>Status</th></tr></thead><tbody>'
-                
-                has_sn_products = False
-                
-                for move in wizard.picking_id.move_ids_without_package:
-                    product_tmpl = move.product_id.product_tmpl_id
-                    
-                    # ONLY show products with SN tracking enabled
-                    if move.product_id.tracking != 'serial' or not product_tmpl.sn_product_type:
-                        continue
-                    
-                    has_sn_products = True
-                    
-                    expected = int(move.product_uom_qty)
-                    scanned = len(wizard.picking_id.sn_move_ids.filtered(
-                        lambda sm: sm.serial_number_id.product_id.product_tmpl_id == product_tmpl
-                    ))
-                    remaining = expected - scanned
-                    
-                    if scanned >= expected:
-                        status = '<span style="color: green;">✓ Complete</span>'
-                        row_style = 'background: #d4edda;'
-                    elif scanned > 0:
-                        status = '<span style="color: orange;">◐ Partial</span>'
-                        row_style = 'background: #fff3cd;'
-                    else:
-                        status = '<span style="color: red;">○ Pending</span>'
-                        row_style = ''
-                    
-                    html += f'<tr style="{row_style}">'
-                    html += f'<td>{product_tmpl.name}</td>'
-                    html += f'<td class="text-center">{expected}</td>'
-                    html += f'<td class="text-center"><strong>{scanned}</strong></td>'
-                    html += f'<td class="text-center"><strong style="color: red;">{remaining}</strong></td>'
-                    html += f'<td class="text-center">{status}</td></tr>'
-                
-                html += '</tbody></table></div>'
-                
-                if has_sn_products:
-                    wizard.expected_quantities = html
-                else:
-                    wizard.expected_quantities = '<div class="alert alert-info">No products with Serial Number tracking in this picking.</div>'
-            else:
-                wizard.expected_quantities = ''
+            wizard.total_scanned = len(wizard.picking_id.sn_move_ids) if wizard.picking_id else 0
     
     @api.depends('picking_id')
-    def _compute_scanned_list(self):
+    def _compute_scan_progress(self):
+        """Structured progress rows, rendered client side by the brodher_sn_scan_progress widget"""
         for wizard in self:
-            if wizard.picking_id and wizard.picking_id.sn_move_ids:
-                html = '<div style="max-height: 150px; overflow-y: auto; margin-top: 10px;">'
-                html += '<strong>Recently Scanned:</strong><table class="table table-sm">'
-                html += '<thead><tr><th>SN</th><th>Product</th><th>Time</th><th>User</th></tr></thead><tbody>'
-                
-                for move in wizard.picking_id.sn_move_ids.sorted(lambda m: m.move_date, reverse=True)[:10]:
-                    html += f'<tr><td><code>{move.serial_number_name}</code></td>'
-                    html += f'<td><small>{move.product_tmpl_id.name}</small></td>'
-                    html += f'<td><small>{move.move_date.strftime("%H:%M:%S")}</small></td>'
-                    html += f'<td><small>{move.user_id.name}</small></td></tr>'
-                
-                html += '</tbody></table></div>'
-                wizard.scanned_list = html
-            else:
-                wizard.scanned_list = '<p class="text-muted"><em>No serial numbers scanned yet</em></p>'
+            wizard.scan_progress = wizard.picking_id._get_sn_scan_progress() if wizard.picking_id else False
     
     @api.depends('scanned_sn', 'serial_number_id', 'input_method')
     def _compute_sn_info(self):
+        """Serial number details, rendered client side by the brodher_sn_info widget"""
         for wizard in self:
             sn = None
             if wizard.input_method == 'scan' and wizard.scanned_sn:
-                sn = self.env['stock.lot'].search([('name', '=', wizard.scanned_sn), ('sn_type', '!=', False)], limit=1)
+                domain = [('name', '=', wizard.scanned_sn.strip()), ('sn_type', '!=', False)]
+                if wizard.picking_id:
+                    domain.append(('product_id', 'in', wizard.sn_product_ids.ids))
+                lots = self.env['stock.lot'].search(domain, limit=2)
+                # a name shared by several products stays unresolved until confirmed
+                sn = lots if len(lots) == 1 else None
             elif wizard.input_method == 'manual' and wizard.serial_number_id:
                 sn = wizard.serial_number_id
             
             if sn:
                 # Check movement history
-                received = self.env['brodher.sn.move'].search([
-                    ('serial_number_id', '=', sn.id),
-                    ('move_type', '=', 'in'),
-                    ('picking_id.state', '=', 'done')
-                ], limit=1)
-                
-                shipped = self.env['brodher.sn.move'].search([
-                    ('serial_number_id', '=', sn.id),
-                    ('move_type', '=', 'out'),
-                    ('picking_id.state', '=', 'done')
-                ], limit=1)
+                state = sn.sn_state_ids[:1]
+                received = state.received_move_id
+                shipped = state.shipped_move_id
                 
                 # Determine stock status
                 if received and not shipped:
-                    stock_status = '<span style="color: green; font-weight: bold;">✓ IN STOCK</span>'
-                    bg_color = '#d4edda'
+                    stock_status = 'in_stock'
                 elif shipped:
-                    stock_status = '<span style="color: red; font-weight: bold;">✗ SHIPPED OUT</span>'
-                    bg_color = '#f8d7da'
+                    stock_status = 'shipped'
                 else:
-                    stock_status = '<span style="color: orange; font-weight: bold;">○ NEVER RECEIVED</span>'
-                    bg_color = '#fff3cd'
-                
-                # Build info table
-                wizard.sn_info = f'''<div style="padding: 15px; background: {bg_color}; border-radius: 5px; border-left: 4px solid #28a745;">
-                    <h4>Serial Number Info</h4>
-                    <table class="table table-sm">
-                    <tr><td><strong>SN:</strong></td><td><span style="font-family: monospace; font-size: 16px;">{sn.name}</span></td></tr>
-                    <tr><td><strong>Product:</strong></td><td>{sn.product_id.name}</td></tr>
-                    <tr><td><strong>Type:</strong></td><td>{'Man' if sn.sn_type == 'M' else 'Woman'}</td></tr>
-                    <tr><td><strong>Stock Status:</strong></td><td>{stock_status}</td></tr>
-                    <tr><td><strong>SN Status:</strong></td><td>{sn.sn_status.upper() if sn.sn_status else 'NEW'}</td></tr>
-                    <tr><td><strong>QC:</strong></td><td>{'✓ Passed' if sn.qc_passed else '✗ Failed'}</td></tr>
-                '''
-                
-                # Show received info
-                if received:
-                    wizard.sn_info += f'''<tr style="border-top: 2px solid #ddd;"><td><strong>Received:</strong></td>
-                        <td>{received.picking_id.name}<br/>{received.move_date.strftime("%Y-%m-%d %H:%M")}</td></tr>'''
-                
-                # Show shipped info
-                if shipped:
-                    wizard.sn_info += f'''<tr><td><strong>Shipped:</strong></td>
-                        <td>{shipped.picking_id.name}<br/>{shipped.move_date.strftime("%Y-%m-%d %H:%M")}</td></tr>'''
-                
-                wizard.sn_info += '</table></div>'
+                    stock_status = 'never_received'
                 
+                wizard.sn_info = {
+                    'state': 'found',
+                    'name': sn.name,
+                    'product': sn.product_id.name,
+                    'sn_type': 'Man' if sn.sn_type == 'M' else 'Woman',
+                    'stock_status': stock_status,
+                    'sn_status': sn.sn_status.upper() if sn.sn_status else 'NEW',
+                    'qc_passed': sn.qc_passed,
+                    'received': received and {
+                        'picking': received.picking_id.name,
+                        'date': fields.Datetime.to_string(received.move_date),
+                    },
+                    'shipped': shipped and {
+                        'picking': shipped.picking_id.name,
+                        'date': fields.Datetime.to_string(shipped.move_date),
+                    },
+                }
             elif wizard.input_method == 'scan' and wizard.scanned_sn:
-                wizard.sn_info = f'''<div style="padding: 15px; background: #f8d7da; border-radius: 5px;">
-                    <h4 style="color: #721c24;">✗ Serial Number Not Found!</h4>
-                    <p>Serial number <strong>{wizard.scanned_sn}</strong> does not exist.</p></div>'''
+                wizard.sn_info = {'state': 'not_found', 'name': wizard.scanned_sn}
             else:
-                wizard.sn_info = '''<div style="padding: 15px; background: #e7f3ff; border-radius: 5px;">
-                    <p><strong>📱 Ready to scan or select...</strong></p></div>'''
+                wizard.sn_info = {'state': 'idle'}
+    
     @api.onchange('input_method')
     def _onchange_input_method(self):
         
-        if self.input_method == 'scan':
+        if self.input_method != 'manual':
             self.serial_number_id = False
-        else:
+        if self.input_method != 'scan':
             self.scanned_sn = False
+        if self.input_method != 'bulk':
+            self.bulk_sn_text = False
+            self.bulk_sn_file = False
     def action_confirm_scan(self):
         """Confirm scanned serial number with strict validation"""
         self.ensure_one()
         
+        if self.input_method == 'bulk':
+            return self._confirm_bulk_scan()
+        
         # Get SN
         sn = None
         if self.input_method == 'scan':
             if not self.scanned_sn:
                 raise UserError(_('Please scan or enter serial number!'))
-            sn = self.env['stock.lot'].search([('name', '=', self.scanned_sn), ('sn_type', '!=', False)], limit=1)
+            scanned = self.scanned_sn.strip()
+            candidates = self.env['stock.lot']._lookup_serial_candidates(
+                scanned, products=self.sn_product_ids if self.picking_id else None,
+            )
+            sn = candidates.filtered(lambda lot: lot.name == scanned)
+            if len(sn) > 1:
+                raise ValidationError(_(
+                    'Serial Number %s matches several products of this picking:\n%s'
+                ) % (scanned, '\n'.join('- %s' % name for name in sn.product_id.mapped('display_name'))))
             if not sn:
-                raise ValidationError(_('Serial Number %s not found in the system!') % self.scanned_sn)
+                message = _('Serial Number %s not found in the system!') % self.scanned_sn
+                if candidates:
+                    message += _('\n\nDid you mean:\n%s') % '\n'.join('- %s' % name for name in candidates.mapped('name'))
+                raise ValidationError(message)
         else:
             if not self.serial_number_id:
                 raise UserError(_('Please select a serial number!'))
             sn = self.serial_number_id
         
-        # ========================================
-        # VALIDATION BERDASARKAN MOVE TYPE
-        # ========================================
-        
-        if self.move_type == 'in':
-            # INCOMING: Cek jangan sampai double receive
-            existing_in = self.env['brodher.sn.move'].search([
-                ('serial_number_id', '=', sn.id),
-                ('move_type', '=', 'in'),
-                ('picking_id.state', '=', 'done')
-            ], limit=1)
-            
-            if existing_in:
-                raise UserError(_(
-                    '❌ SERIAL NUMBER SUDAH MASUK GUDANG!\n\n'
-                    '🔹 Serial Number: %s\n'
-                    '🔹 Received in: %s\n'
-                    '🔹 Date: %s\n'
-                    '🔹 User: %s\n\n'
-                    '⚠️ Serial number ini TIDAK BISA diterima lagi!'
-                ) % (
-                    sn.name,
-                    existing_in.picking_id.name,
-                    existing_in.move_date.strftime('%Y-%m-%d %H:%M:%S'),
-                    existing_in.user_id.name
-                ))
-        
-        elif self.move_type == 'out':
-            # OUTGOING: Harus sudah masuk gudang dan belum keluar
-            
-            # Cek apakah sudah masuk gudang
-            received = self.env['brodher.sn.move'].search([
-                ('serial_number_id', '=', sn.id),
-                ('move_type', '=', 'in'),
-                ('picking_id.state', '=', 'done')
-            ], limit=1)
-            
-            if not received:
-                raise UserError(_(
-                    '❌ SERIAL NUMBER BELUM MASUK GUDANG!\n\n'
-                    '🔹 Serial Number: %s\n\n'
-                    '⚠️ SN ini belum pernah diterima di gudang.\n'
-                    'Hanya SN yang sudah ada di stock yang bisa dikirim!'
-                ) % sn.name)
-            
-            # Cek apakah sudah pernah keluar
-            shipped = self.env['brodher.sn.move'].search([
-                ('serial_number_id', '=', sn.id),
-                ('move_type', '=', 'out'),
-                ('picking_id.state', '=', 'done')
-            ], limit=1)
-            
-            if shipped:
-                raise UserError(_(
-                    '❌ SERIAL NUMBER SUDAH KELUAR GUDANG!\n\n'
-                    '🔹 Serial Number: %s\n'
-                    '🔹 Shipped in: %s\n'
-                    '🔹 Date: %s\n'
-                    '🔹 User: %s\n\n'
-                    '⚠️ SN ini sudah tidak ada di gudang!'
-                ) % (
-                    sn.name,
-                    shipped.picking_id.name,
-                    shipped.move_date.strftime('%Y-%m-%d %H:%M:%S'),
-                    shipped.user_id.name
-                ))
-            
-            # Status harus available
-            if sn.sn_status != 'available':
-                raise UserError(_(
-                    '❌ STATUS SERIAL NUMBER TIDAK VALID!\n\n'
-                    '🔹 Serial Number: %s\n'
-                    '🔹 Current Status: %s\n'
-                    '🔹 Required Status: AVAILABLE\n\n'
-                    '⚠️ Hanya SN dengan status Available yang bisa dikirim!'
-                ) % (sn.name, sn.sn_status.upper()))
-        
-        # Validation: Product in picking
-        product_in_picking = sn.product_id in self.picking_id.move_ids_without_package.mapped('product_id')
-        if not product_in_picking:
-            raise UserError(_(
-                '❌ PRODUCT TIDAK ADA DI PICKING INI!\n\n'
-                '🔹 Serial Number: %s\n'
-                '🔹 Product: %s\n\n'
-                '⚠️ Product ini tidak ada dalam picking.'
-            ) % (sn.name, sn.product_id.name))
-        
-        # Validation: Already scanned in THIS picking
-        existing_in_this_picking = self.env['brodher.sn.move'].search([
-            ('picking_id', '=', self.picking_id.id),
-            ('serial_number_id', '=', sn.id)
-        ])
-        if existing_in_this_picking:
-            raise UserError(_(
-                '❌ SUDAH DI-SCAN DI PICKING INI!\n\n'
-                '🔹 Serial Number: %s\n'
-                '🔹 Scanned by: %s\n'
-                '🔹 Date: %s'
-            ) % (sn.name, existing_in_this_picking.user_id.name, existing_in_this_picking.move_date))
+        errors = self.picking_id._check_sn_scans(sn, self.move_type)
+        if errors:
+            raise UserError(errors[sn.id][1])
         
-        # ========================================
-        # ALL VALIDATIONS PASSED - CREATE RECORD
-        # ========================================
-        
-        move_vals = {
-            'serial_number_id': sn.id,
-            'move_type': self.move_type,
-            'location_src_id': self.location_src_id.id if self.location_src_id else False,
-            'location_dest_id': self.location_dest_id.id,
-            'picking_id': self.picking_id.id,
-            'notes': self.notes,
-        }
-        
-        sn_move = self.env['brodher.sn.move'].create(move_vals)
-        
-        # Update SN status
-        update_vals = {'last_sn_move_date': fields.Datetime.now()}
-        
-        if self.move_type == 'in':
-            update_vals['sn_status'] = 'available'
-        elif self.move_type == 'out':
-            update_vals['sn_status'] = 'used'
-        elif self.move_type == 'internal':
-            update_vals['sn_status'] = 'reserved'
-        
-        sn.write(update_vals)
-        
-        # Auto assign to move line
-        for move_line in self.picking_id.move_line_ids_without_package:
-            if move_line.product_id == sn.product_id and not move_line.lot_id:
-                move_line.write({
-                    'lot_id': sn.id,
-                    'lot_name': sn.name,
-                    'quantity': 1,
-                })
-                _logger.info('✓ Auto assigned SN %s to move line' % sn.name)
-                break
+        self.picking_id._register_sn_scans(
+            sn, self.move_type,
+            location_src_id=self.location_src_id.id if self.location_src_id else False,
+            location_dest_id=self.location_dest_id.id,
+            notes=self.notes,
+        )
         
         _logger.info('✓ SN %s scanned - Type: %s, Picking: %s' % (sn.name, self.move_type, self.picking_id.name))
         
@@ -460,6 +187,69 @@ class ScanSNWizard(models.TransientModel):
             }
         }
 
+    def _get_bulk_sn_names(self):
+        """Serial names from the pasted text and the uploaded file, in order"""
+        raw = self.bulk_sn_text or ''
+        if self.bulk_sn_file:
+            content = base64.b64decode(self.bulk_sn_file)
+            try:
+                content = content.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                content = content.decode('latin-1')
+            # CSV: serial number in the first column
+            raw += '\n' + '\n'.join(line.split(',')[0].split(';')[0] for line in content.splitlines())
+        return [name.strip().strip('"') for name in re.split(r'[\n,;\t]+', raw) if name.strip().strip('"')]
+    
+    def _confirm_bulk_scan(self):
+        """Validate and register a whole list of SNs with set-based queries"""
+        names = self._get_bulk_sn_names()
+        if not names:
+            raise UserError(_('Please paste or upload at least one serial number!'))
+        
+        failures = []
+        unique_names = []
+        seen = set()
+        for name in names:
+            if name in seen:
+                failures.append((name, _('Duplicate in the list')))
+                continue
+            seen.add(name)
+            unique_names.append(name)
+        location_src_id = self.location_src_id.id if self.location_src_id else False
+        
+        if len(unique_names) > BULK_SCAN_INLINE_LIMIT:
+            job = self.env['brodher.sn.job']._enqueue('bulk_receipt', _('Bulk scan on %s') % self.picking_id.name, {
+                'picking_id': self.picking_id.id,
+                'names': unique_names,
+                'move_type': self.move_type,
+                'location_src_id': location_src_id,
+                'location_dest_id': self.location_dest_id.id,
+                'notes': self.notes,
+            }, total=len(unique_names))
+            return job._action_notify_queued()
+        
+        registered, scan_failures = self.picking_id._process_sn_bulk_scan(
+            unique_names, self.move_type,
+            location_src_id=location_src_id,
+            location_dest_id=self.location_dest_id.id,
+            notes=self.notes,
+        )
+        failures += scan_failures
+        
+        message = _('Bulk scan on %s\n\n✓ Registered: %d\n❌ Failed: %d') % (
+            self.picking_id.name, len(registered), len(failures))
+        if failures:
+            message += '\n\n' + '\n'.join('%s: %s' % failure for failure in failures)
+        message_id = self.env['brodher.message.wizard'].create({'message': message})
+        return {
+            'name': _('Bulk Scan Result'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'brodher.message.wizard',
+            'res_id': message_id.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+    
     def action_done(self):
         is_complete, error_msg = self.picking_id._check_sn_scan_completion()
         if not is_complete:
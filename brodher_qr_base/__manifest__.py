@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+{
+    'name': 'Brodher QR Code Tools',
+    'version': '18.0.1.0.0',
+    'category': 'Hidden',
+    'summary': 'QR code rendering shared by the Brodher serial number modules',
+    'description': """
+        One implementation of the QR rendering helpers (PNG with LRU cache,
+        batch rendering, inline SVG, ETag) and of the on demand QR image
+        response, used by brodher_product_serial and brodher_product_Sn.
+    """,
+    'author': 'Brodher',
+    'website': 'https://www.brodher.com',
+    'license': 'LGPL-3',
+    'depends': ['base'],
+    'external_dependencies': {'python': ['qrcode', 'pillow']},
+    'data': [],
+    'installable': True,
+    'application': False,
+    'auto_install': False,
+}
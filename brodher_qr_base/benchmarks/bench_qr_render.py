@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of the batch QR renderer against the number of worker processes.
+
+Runs without an Odoo server::
+
+    python brodher_qr_base/benchmarks/bench_qr_render.py --count 20000
+
+Every run starts from an empty cache and renders ``--count`` distinct serial
+names; the speedup column is relative to the single-process run.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+MODULE_NAME = 'brodher_qr_code_bench'
+
+
+def load_qr_code():
+    path = os.path.join(os.path.dirname(__file__), os.pardir, 'tools', 'qr_code.py')
+    spec = importlib.util.spec_from_file_location(MODULE_NAME, os.path.abspath(path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def default_workers():
+    cpu_count = os.cpu_count() or 1
+    workers, count = [], 1
+    while count < cpu_count:
+        workers.append(count)
+        count *= 2
+    workers.append(cpu_count)
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=5000, help='number of serial numbers to render')
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers(),
+                        help='worker counts to benchmark (default: powers of two up to the CPU count)')
+    args = parser.parse_args()
+
+    qr_code = load_qr_code()
+    values = [f'PF25W{seq:07d}' for seq in range(1, args.count + 1)]
+
+    print(f'{args.count} QR codes, {os.cpu_count()} CPUs')
+    print(f'{"workers":>8} {"seconds":>9} {"labels/s":>10} {"speedup":>8}')
+    baseline = None
+    for workers in args.workers:
+        qr_code.render_qr_png.cache_clear()
+        start = time.perf_counter()
+        pngs = qr_code.render_qr_png_batch(values, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        assert len(pngs) == len(values)
+        baseline = baseline or elapsed
+        print(f'{workers:>8} {elapsed:>9.2f} {args.count / elapsed:>10.0f} {baseline / elapsed:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
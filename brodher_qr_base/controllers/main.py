@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from odoo.http import request
+
+from ..tools import qr_code
+
+
+def qr_png_response(value):
+    """HTTP response with the QR image of ``value``, for the on demand QR routes.
+
+    The image only depends on the value, so it is served with a strong ETag
+    and a long-lived cache header.
+    """
+    etag = qr_code.qr_etag(value)
+    headers = [
+        ('ETag', '"%s"' % etag),
+        ('Cache-Control', 'private, max-age=31536000, immutable'),
+    ]
+    if request.httprequest.if_none_match.contains(etag):
+        return request.make_response(b'', headers=headers, status=304)
+    
+    png = qr_code.render_qr_png(value)
+    headers += [
+        ('Content-Type', 'image/png'),
+        ('Content-Length', len(png)),
+    ]
+    return request.make_response(png, headers=headers)
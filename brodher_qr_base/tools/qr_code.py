@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""QR code rendering helpers shared by the models, controllers and reports.
+
+Kept free of Odoo imports so the helpers can be used from standalone scripts.
+"""
+import hashlib
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from io import BytesIO
+
+import qrcode
+
+# Below this many images starting the worker processes costs more than it saves
+PARALLEL_THRESHOLD = 500
+# Module name under which the pool workers load this file, see _worker_loader
+WORKER_MODULE = 'brodher_qr_code_worker'
+
+
+@lru_cache(maxsize=4096)
+def render_qr_png(value, box_size=10, border=4, error_correction='L'):
+    """Render ``value`` as a QR code and return the PNG bytes.
+
+    ``error_correction`` is the level letter: L, M, Q or H.
+    """
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=getattr(qrcode.constants, 'ERROR_CORRECT_%s' % error_correction),
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(value)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=4096)
+def render_qr_svg(value, border=4):
+    """Render ``value`` as a compact inline SVG document.
+
+    Each row is drawn as horizontal strokes one module high, chained with
+    relative moves in a single path, so the output stays small and scales
+    to any size without blurring.
+    """
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        border=border,
+    )
+    qr.add_data(value)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+    size = len(matrix)
+    path = []
+    for y, row in enumerate(matrix):
+        x, pen = 0, None
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            if pen is None:
+                path.append(f'M{start} {y}.5h{x - start}')
+            else:
+                path.append(f'm{start - pen} 0h{x - start}')
+            pen = x
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" '
+        f'width="100%" height="100%" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{"".join(path)}" stroke="#000"/></svg>'
+    )
+
+
+def render_qr_png_batch(values, box_size=10, border=4, error_correction='L', max_workers=None):
+    """Render many QR codes and return the PNG bytes in the order of ``values``.
+
+    Values are rendered inline through the cache, duplicated values only
+    once. Large batches are fanned out to a process pool when ``max_workers``
+    is passed (``0`` sizes it to the machine), e.g. by the label jobs. The
+    workers are started with forkserver/spawn, never by forking the
+    multi-threaded server process.
+    """
+    values = list(values)
+    unique_values = list(dict.fromkeys(values))
+    if max_workers is None:
+        max_workers = 1
+    max_workers = min(max_workers or os.cpu_count() or 1, len(unique_values))
+    if max_workers < 2 or len(unique_values) < PARALLEL_THRESHOLD:
+        pngs = [render_qr_png(value, box_size, border, error_correction) for value in unique_values]
+    else:
+        chunksize = max(1, len(unique_values) // (max_workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=_mp_context(),
+            initializer=exec,
+            initargs=(_worker_loader(), {}),
+        ) as executor:
+            pngs = list(executor.map(
+                _worker_module()._pool_render, unique_values,
+                [box_size] * len(unique_values),
+                [border] * len(unique_values),
+                [error_correction] * len(unique_values),
+                chunksize=chunksize,
+            ))
+    by_value = dict(zip(unique_values, pngs))
+    return [by_value[value] for value in values]
+
+
+def _mp_context():
+    # Never fork: the Odoo server is multi-threaded and a forked child can
+    # inherit locks held by other threads
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _worker_loader():
+    """Source loading this file as WORKER_MODULE, run by every pool worker.
+
+    Fresh worker interpreters do not know the Odoo addons path, so they
+    could not import this module under its ``odoo.addons`` name. The parent
+    loads the same copy, so the render function pickles by that name.
+    """
+    return (
+        'import importlib.util, sys\n'
+        'spec = importlib.util.spec_from_file_location(%r, %r)\n'
+        'module = importlib.util.module_from_spec(spec)\n'
+        'sys.modules[spec.name] = module\n'
+        'spec.loader.exec_module(module)\n'
+    ) % (WORKER_MODULE, os.path.abspath(__file__))
+
+
+def _worker_module():
+    if WORKER_MODULE not in sys.modules:
+        exec(_worker_loader(), {})
+    return sys.modules[WORKER_MODULE]
+
+
+def _pool_render(value, box_size, border, error_correction):
+    return render_qr_png(value, box_size, border, error_correction)
+
+
+def qr_etag(value, box_size=10, border=4):
+    """Strong validator for the image rendered by :func:`render_qr_png`"""
+    return hashlib.sha1(f'{value}|{box_size}|{border}'.encode()).hexdigest()
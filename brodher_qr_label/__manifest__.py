@@ -1,14 +1,16 @@
 {
     'name': 'QR Code Serial Label',
-    'version': '1.0',
+    'version': '1.1',
     'category': 'Inventory',
     'summary': 'Generate QR Code Label for Received Products',
-    'depends': ['stock', 'product'],
+    'depends': ['stock', 'product', 'brodher_qr_base'],
     'data': [
-        # 'security/ir.model.access.csv',
+        'security/ir.model.access.csv',
+        'data/ir_sequence_data.xml',
         # 'views/qr_label_menu.xml',
-        # 'report/qr_label_template.xml',
+        'report/qr_label_template.xml',
         'report/qr_label_report.xml',
+        'report/qr_label_zpl_report.xml',
     ],
     'installable': True,
     'application': False,
@@ -1,18 +1,55 @@
 from odoo import models, fields, api
 import base64
-import io
-import qrcode
+import hashlib
+
+from odoo.addons.brodher_qr_base.tools.qr_code import render_qr_png_batch
+
+# Size of the label QR images
+QR_BOX_SIZE = 4
+QR_BORDER = 2
+QR_ERROR_CORRECTION = 'M'
+# Large reprints are spread over a process pool, one worker per CPU
+QR_RENDER_WORKERS = 0
+# System parameter enabling the attachment cache shared across reprints
+QR_CACHE_PARAM = 'brodher_qr_label.persistent_qr_cache'
 
 class StockPicking(models.Model):
     _inherit = 'stock.picking'
 
     def action_generate_qr_labels(self):
-        for move in self.move_lines:
-            for i in range(int(move.quantity_done)):
-                self.env['qr.label.serial'].create({
-                    'product_id': move.product_id.id,
-                    'picking_id': self.id,
-                })
+        self._generate_qr_labels()
+        return True
+
+    def _generate_qr_labels(self):
+        """Create the missing labels of the pickings, one per done unit.
+
+        Idempotent: labels already created for a picking and product are
+        counted first, so running it again only adds what is missing. All
+        names are reserved in one go and the labels are created with a
+        single multi-create.
+        """
+        Label = self.env['qr.label.serial']
+        existing = {
+            (picking.id, product.id): count
+            for picking, product, count in Label._read_group(
+                [('picking_id', 'in', self.ids)], ['picking_id', 'product_id'], ['__count'],
+            )
+        }
+        needed = {}
+        for move in self.move_ids.filtered(lambda m: m.state != 'cancel'):
+            key = (move.picking_id.id, move.product_id.id)
+            needed[key] = needed.get(key, 0) + int(move.quantity)
+
+        vals_list = [
+            {'picking_id': picking_id, 'product_id': product_id}
+            for (picking_id, product_id), quantity in needed.items()
+            for _i in range(quantity - existing.get((picking_id, product_id), 0))
+        ]
+        if not vals_list:
+            return Label
+        for vals, name in zip(vals_list, Label._reserve_names(len(vals_list))):
+            vals['name'] = name
+        return Label.create(vals_list)
 
 class QLabelSerial(models.Model):
     _name = 'qr.label.serial'
@@ -20,15 +57,112 @@ class QLabelSerial(models.Model):
 
     name = fields.Char(string="Serial", readonly=True, default=lambda self: self.env['ir.sequence'].next_by_code('qr.label.serial'))
     product_id = fields.Many2one('product.product', string="Product", required=True)
-    picking_id = fields.Many2one('stock.picking', string="Stock Picking")
+    picking_id = fields.Many2one('stock.picking', string="Stock Picking", index=True)
+
+    @api.model
+    def _reserve_names(self, count):
+        """Reserve ``count`` consecutive names of the qr.label.serial sequence at once"""
+        sequence = self.env['ir.sequence'].search([
+            ('code', '=', 'qr.label.serial'),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return [False] * count
+        if sequence.use_date_range:
+            # numbers live in the date range sub-sequences, keep the ORM path
+            return [sequence.next_by_id() for _i in range(count)]
+
+        if sequence.implementation == 'standard':
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ['ir_sequence_%03d' % sequence.id, count],
+            )
+            numbers = [row[0] for row in self.env.cr.fetchall()]
+        else:
+            sequence.flush_recordset(['number_next', 'number_increment'])
+            self.env.cr.execute("""
+                UPDATE ir_sequence
+                   SET number_next = number_next + number_increment * %s
+                 WHERE id = %s
+             RETURNING number_next - number_increment * %s, number_increment
+            """, [count, sequence.id, count])
+            first, increment = self.env.cr.fetchone()
+            sequence.invalidate_recordset(['number_next'])
+            numbers = [first + increment * i for i in range(count)]
+        return [sequence.get_next_char(number) for number in numbers]
 
     def get_qr_code_base64(self):
-        for record in self:
-            qr = qrcode.QRCode(box_size=4, border=2)
-            qr.add_data(record.name)
-            qr.make(fit=True)
-            img = qr.make_image()
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            img_str = base64.b64encode(buffer.getvalue()).decode()
-            return f"data:image/png;base64,{img_str}"
\ No newline at end of file
+        self.ensure_one()
+        return self._get_qr_code_data_uris()[self.id]
+
+    def _get_qr_code_data_uris(self):
+        """Return ``{label id: PNG data URI}`` of the whole recordset in one go.
+
+        Each distinct name is encoded once. With the
+        ``brodher_qr_label.persistent_qr_cache`` system parameter set, the
+        PNGs are also kept as attachments keyed by the hash of the name and
+        image size, so reprints skip the encoding.
+        """
+        names = list(dict.fromkeys(name for name in self.mapped('name') if name))
+        pngs = {}
+        use_cache = bool(self.env['ir.config_parameter'].sudo().get_param(QR_CACHE_PARAM))
+        if use_cache and names:
+            pngs = self._read_cached_qr_pngs(names)
+        missing = [name for name in names if name not in pngs]
+        if missing:
+            rendered = dict(zip(missing, render_qr_png_batch(
+                missing, box_size=QR_BOX_SIZE, border=QR_BORDER,
+                error_correction=QR_ERROR_CORRECTION, max_workers=QR_RENDER_WORKERS,
+            )))
+            if use_cache:
+                self._write_cached_qr_pngs(rendered)
+            pngs.update(rendered)
+        uris = {name: 'data:image/png;base64,%s' % base64.b64encode(png).decode() for name, png in pngs.items()}
+        return {record.id: uris.get(record.name, '') for record in self}
+
+    @api.model
+    def _qr_cache_key(self, name):
+        """Attachment name of a cached image: hash of the value and of every render parameter"""
+        render_params = {
+            'box_size': QR_BOX_SIZE,
+            'border': QR_BORDER,
+            'error_correction': QR_ERROR_CORRECTION,
+        }
+        key = '|'.join([name] + ['%s=%s' % item for item in sorted(render_params.items())])
+        return 'qr_label_%s.png' % hashlib.sha1(key.encode()).hexdigest()
+
+    @api.model
+    def _read_cached_qr_pngs(self, names):
+        keys = {self._qr_cache_key(name): name for name in names}
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', 0),
+            ('name', 'in', list(keys)),
+        ])
+        return {keys[attachment.name]: attachment.raw for attachment in attachments if attachment.raw}
+
+    @api.model
+    def _write_cached_qr_pngs(self, pngs):
+        self.env['ir.attachment'].sudo().create([{
+            'name': self._qr_cache_key(name),
+            'type': 'binary',
+            'raw': png,
+            'res_model': self._name,
+            'res_id': 0,
+            'mimetype': 'image/png',
+        } for name, png in pngs.items()])
+
+class ReportQRLabelDocument(models.AbstractModel):
+    """Render the QR images of all printed labels before the template runs"""
+    _name = 'report.brodher_qr_label.report_qr_label_document'
+    _description = 'QR Label Report'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['qr.label.serial'].browse(docids)
+        return {
+            'doc_ids': docids,
+            'doc_model': 'qr.label.serial',
+            'docs': docs,
+            'qr_codes': docs._get_qr_code_data_uris(),
+        }